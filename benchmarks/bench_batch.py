@@ -0,0 +1,85 @@
+"""One expression over many rows: Interpreter per row vs. BatchInterpreter.
+
+    python benchmarks/bench_batch.py [rows]
+
+Needs numpy.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+import src
+
+EXPRESSION = 'agar x > y phir (x - y) / z nahito_agar x == y phir 0 nahito (y * 2 + x) / (z - 1) aur sach'
+
+
+def parse(text):
+    tokens, error = src.Lexer(text, '<bench>').getTokens()
+    if error: raise SystemExit(error.asStr())
+    ast = src.Parser(tokens).parse()
+    if ast.error: raise SystemExit(ast.error.asStr())
+    return ast.node
+
+
+def makeColumns(rows):
+    rng = random.Random(0)
+    return {name: np.array([rng.randint(-50, 50) for _ in range(rows)]) for name in 'xyz'}
+
+
+def globalContext():
+    table = src.SymbolTable()
+    table.set('null', src.Number(0))
+    table.set('sach', src.Number(1))
+    table.set('jhut', src.Number(0))
+    context = src.Context('<bench>')
+    context.symbolTable = table
+    return context
+
+
+def timePerRow(node, columns):
+    context = globalContext()
+    lists = {name: column.tolist() for name, column in columns.items()}
+    rows = len(lists['x'])
+    interpreter = src.Interpreter()
+    failed = 0
+
+    start = time.perf_counter()
+    for row in range(rows):
+        table = src.SymbolTable()
+        table.parent = context.symbolTable
+        for name, column in lists.items():
+            table.set(name, src.Number(column[row]))
+        rowContext = src.Context('<row>')
+        rowContext.symbolTable = table
+        if interpreter.visit(node, rowContext).error:
+            failed += 1
+    return time.perf_counter() - start, failed
+
+
+def timeBatch(node, columns):
+    context = globalContext()
+    start = time.perf_counter()
+    result = src.BatchInterpreter().evaluate(node, columns, context)
+    return time.perf_counter() - start, int(result.failed.sum())
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    node = parse(EXPRESSION)
+    columns = makeColumns(rows)
+
+    perRow, failedPerRow = timePerRow(node, columns)
+    batch, failedBatch = min(timeBatch(node, columns) for _ in range(5))
+    assert failedPerRow == failedBatch, (failedPerRow, failedBatch)
+
+    print(f'{rows} rows, {failedBatch} division by zero')
+    print(f'  per row : {perRow:.3f}s  ({rows / perRow:,.0f} rows/s)')
+    print(f'  batch   : {batch:.4f}s  ({rows / batch:,.0f} rows/s, {perRow / batch:.0f}x)')
+
+
+if __name__ == '__main__':
+    main()
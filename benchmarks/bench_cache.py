@@ -0,0 +1,61 @@
+"""Compiling vs. ProgramCache hits in memory and from cache files.
+
+    python benchmarks/bench_cache.py [terms]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import src
+
+
+def makeSource(terms, variant):
+    body = ' + '.join(f'(agar x > {i} phir x * {i} nahito y / {i + 1})' for i in range(terms))
+    return f'yehai r{variant} = {body}'
+
+
+def timeIt(fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    terms = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    sources = [makeSource(terms, variant) for variant in range(20)]
+    directory = tempfile.mkdtemp(prefix='swing-cache-')
+    try:
+        compileAll = timeIt(lambda: [src.compile(source) for source in sources])
+
+        cache = src.ProgramCache(maxsize=64, directory=directory)
+        for source in sources:
+            cache.compile(source)
+        memoryHits = timeIt(lambda: [cache.compile(source) for source in sources])
+
+        # a restarted process: a new cache validates and loads the files
+        def restart():
+            warm = src.ProgramCache(maxsize=64, directory=directory)
+            for source in sources:
+                warm.compile(source)
+        restarted = timeIt(restart)
+
+        perProgram = 1000 / len(sources)
+        print(f'{len(sources)} programs of {len(sources[0])} characters')
+        print(f'  compile          {compileAll * perProgram:8.3f} ms/program')
+        print(f'  cache files      {restarted * perProgram:8.3f} ms/program  ({compileAll / restarted:.0f}x)')
+        print(f'  memory hit       {memoryHits * perProgram:8.3f} ms/program  ({compileAll / memoryHits:.0f}x)')
+        print(f'  {cache.stats}')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
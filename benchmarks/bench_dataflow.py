@@ -0,0 +1,77 @@
+"""Sequential execution vs the dataflow scheduler on independent statements.
+
+    python benchmarks/bench_dataflow.py [statements]
+
+The program is a set of independent counting loops, each with its own
+variables, followed by one statement that reads them all. Every run is
+checked against sequential execution. With the GIL the scheduler can only
+cost time (this shows its overhead); on a free-threaded build the loops
+run in parallel.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import src
+
+WORKERS = (1, 2, 4, 8)
+
+
+def makeProgram(count):
+    lines = []
+    for k in range(count):
+        lines.append(f'yehai i{k} = 0')
+        lines.append(f'jabtak i{k} < {2000 + k * 10} phir yehai i{k} = i{k} + 1')
+    lines.append(' + '.join(f'i{k}' for k in range(count)))
+    return '\n'.join(lines)
+
+
+def parse(text):
+    tokens, error = src.Lexer(text, '<bench>').getTokens()
+    statements = src.Parser(tokens).parse_program().node
+    resolver = src.Resolver()
+    for node in statements:
+        resolver.resolve(node)
+    return statements
+
+
+def freshContext():
+    context = src.Context('<bench>')
+    context.symbolTable = src.SymbolTable()
+    return context
+
+
+def timeSequential(statements):
+    context = freshContext()
+    interpreter = src.Interpreter()
+    start = time.perf_counter()
+    results = [interpreter.visit(node, context) for node in statements]
+    return time.perf_counter() - start, results[-1].value.value
+
+
+def timeScheduler(statements, workers):
+    context = freshContext()
+    start = time.perf_counter()
+    results = src.DataflowScheduler(workers).run(statements, context)
+    return time.perf_counter() - start, results[-1].value.value
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    statements = parse(makeProgram(count))
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'{count} independent loops, {os.cpu_count()} CPUs, GIL {"enabled" if gil else "disabled"}')
+    sequential, expected = min(timeSequential(statements) for _ in range(3))
+    print(f'  sequential          {sequential * 1000:8.1f} ms')
+    for workers in WORKERS:
+        elapsed, value = min(timeScheduler(statements, workers) for _ in range(3))
+        if value != expected:
+            raise SystemExit(f'wrong result with {workers} workers')
+        print(f'  {workers} worker{"s" if workers > 1 else " "}           {elapsed * 1000:8.1f} ms  ({sequential / elapsed:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Recursive against explicit-stack tree walking, shallow and deep.
+
+    python benchmarks/bench_iterative.py [terms]
+
+Times Interpreter and IterativeInterpreter (tier-up off for both) on a
+loop, on expressions of ordinary depth, and on sum chains of growing
+length: Interpreter recurses once per term and fails with RecursionError
+long before the largest.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import src
+
+SHALLOW = {
+    'loop': 'jabtak i < 3000 phir (yehai s = s + i * 2 - 1) + (yehai i = i + 1)',
+    'arithmetic': ' + '.join(f'({i} * 3 - {i} / 2 + x)' for i in range(50)),
+    'agar': ' + '.join(f'(agar x > {i} phir {i} nahito_agar x == {i} phir 0 nahito 1)' for i in range(50)),
+}
+
+
+def parse(text):
+    tokens, error = src.Lexer(text, '<bench>').getTokens()
+    if error: raise SystemExit(error.asStr())
+    ast = src.Parser(tokens).parse()
+    if ast.error: raise SystemExit(ast.error.asStr())
+    src.Resolver().resolve(ast.node)
+    return ast.node
+
+
+def timeVisit(backend, node, repeat=5):
+    best = None
+    for _ in range(repeat):
+        context = src.Context('<bench>')
+        context.symbolTable = src.SymbolTable()
+        for name in ('i', 's', 'x'):
+            context.symbolTable.set(name, src.Number(0))
+        interpreter = backend(hot_loop_threshold=None)
+        start = time.perf_counter()
+        try:
+            result = interpreter.visit(node, context)
+        except RecursionError:
+            return None
+        elapsed = time.perf_counter() - start
+        if result.error: raise SystemExit(result.error.asStr())
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(name, node):
+    base = timeVisit(src.Interpreter, node)
+    iterative = timeVisit(src.IterativeInterpreter, node)
+    line = f'{name:22}'
+    line += f' {base * 1000:9.2f} ms' if base is not None else f' {"RecursionError":>12}'
+    line += f' {iterative * 1000:9.2f} ms'
+    if base is not None:
+        line += f'  ({iterative / base:.2f}x)'
+    print(line)
+
+
+def main():
+    terms = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f'{"":22} {"Interpreter":>12} {"Iterative":>12}')
+    for name, text in SHALLOW.items():
+        report(name, parse(text))
+    n = 100
+    while n <= terms:
+        report(f'sum chain {n}', parse(' + '.join(['x'] * n)))
+        n *= 10
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Lexer throughput in MB/s over a large generated source line.
+
+    python benchmarks/bench_lexer.py [size_in_kb]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import src
+
+CHUNK = 'yehai total = total + agar count >= 10 phir 2.5 * (rate - 1) nahito_agar na done phir 0 nahito 1 '
+
+
+def makeSource(sizeKb):
+    repeats = max(1, sizeKb * 1024 // len(CHUNK))
+    return CHUNK * repeats
+
+
+def main():
+    sizeKb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    text = makeSource(sizeKb)
+    megabytes = len(text) / (1024 * 1024)
+
+    best = None
+    for _ in range(5):
+        start = time.perf_counter()
+        tokens, error = src.Lexer(text, '<bench>').getTokens()
+        elapsed = time.perf_counter() - start
+        if error: raise SystemExit(error.asStr())
+        best = elapsed if best is None else min(best, elapsed)
+
+    print(f'{megabytes:.2f} MB, {len(tokens)} tokens')
+    print(f'  {best:.3f}s  {megabytes / best:.2f} MB/s  {len(tokens) / best / 1e6:.2f} Mtok/s')
+
+
+if __name__ == '__main__':
+    main()
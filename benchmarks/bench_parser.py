@@ -0,0 +1,38 @@
+"""Parser throughput on long expression chains.
+
+    python benchmarks/bench_parser.py [terms]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import src
+
+WORKLOADS = {
+    'sum chain': lambda n: ' + '.join(['1'] * n),
+    'mixed precedence': lambda n: ' + '.join(f'x * {i} - y / 2 < {i} aur na z' for i in range(n // 8)),
+    'literals in parens': lambda n: ' * '.join(['(2)'] * (n // 2)),
+}
+
+
+def timeParse(tokens):
+    start = time.perf_counter()
+    ast = src.Parser(tokens).parse()
+    elapsed = time.perf_counter() - start
+    if ast.error: raise SystemExit(ast.error.asStr())
+    return elapsed
+
+
+def main():
+    terms = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for name, build in WORKLOADS.items():
+        tokens, error = src.Lexer(build(terms), '<bench>').getTokens()
+        if error: raise SystemExit(error.asStr())
+        best = min(timeParse(tokens) for _ in range(3))
+        print(f'{name:<20} {len(tokens):>8} tokens  {best:.3f}s  {len(tokens) / best / 1e3:.0f}k tokens/s')
+
+
+if __name__ == '__main__':
+    main()
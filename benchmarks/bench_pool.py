@@ -0,0 +1,73 @@
+"""Scaling of BatchRunner across worker processes.
+
+    python benchmarks/bench_pool.py [programs]
+
+Runs the same batch of CPU-bound programs serially in this process and then
+on pools of 1, 2, 4... workers up to the number of CPUs, checking every
+result. Pools are started before timing, so the numbers are steady-state
+throughput; with one worker per core the speedup should be close to the
+worker count, less the cost of pickling programs and results.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import src
+
+TEMPLATE = 'yehai i = 0\nyehai s = 0\njabtak i < {n} phir (yehai s = s + i * {k}) + (yehai i = i + 1)\ns'
+
+
+def makeSources(count):
+    return [TEMPLATE.format(n=2000 + i % 17 * 100, k=i % 7) for i in range(count)]
+
+
+def expected(source):
+    n = int(source.split('i < ')[1].split()[0])
+    k = int(source.split('i * ')[1].split(')')[0])
+    return sum(i * k for i in range(n))
+
+
+def check(sources, results):
+    for source, res in zip(sources, results):
+        if res.error or res.value.value != expected(source):
+            raise SystemExit(f'wrong result for {source!r}')
+
+
+def timeSerial(programs):
+    start = time.perf_counter()
+    results = [program.run() for program in programs]
+    return time.perf_counter() - start, results
+
+
+def timePool(programs, workers):
+    with src.BatchRunner(workers) as runner:
+        runner.run(programs[:workers])  # start the workers
+        start = time.perf_counter()
+        results = runner.run(programs)
+        return time.perf_counter() - start, results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    sources = makeSources(count)
+    cache = src.ProgramCache()
+    programs = [cache.compile(source) for source in sources]
+
+    cpus = os.cpu_count() or 1
+    print(f'{count} programs, {cpus} CPUs')
+    serial, results = timeSerial(programs)
+    check(sources, results)
+    print(f'  serial             {count / serial:9,.0f} programs/s')
+
+    workers = 1
+    while workers <= cpus:
+        elapsed, results = timePool(programs, workers)
+        check(sources, results)
+        print(f'  {workers:2} worker{"s" if workers > 1 else " "}         {count / elapsed:9,.0f} programs/s  ({serial / elapsed:.2f}x)')
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Cost of counting steps, and time-slicing many programs on one thread.
+
+    python benchmarks/bench_stepping.py [iterations]
+
+First the same loop under Interpreter (tier-up off), BudgetInterpreter and
+SteppingInterpreter. Then one long loop and a number of short ones are
+started together: run one after another, the short programs queued behind
+the long one wait for all of it, while round_robin() finishes them within
+a few quanta.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import src
+from src.budget import round_robin
+
+LOOP = 'jabtak i < {n} phir (yehai s = s + i * 2) + (yehai i = i + 1)'
+SHORT = 20
+QUANTUM = 1000
+
+
+def parse(text):
+    ast = src.parse_stream(src.Lexer(text, '<bench>'))
+    src.Resolver().resolve(ast.node)
+    return ast.node
+
+
+def freshContext():
+    table = src.SymbolTable()
+    table.set('i', src.Number(0))
+    table.set('s', src.Number(0))
+    context = src.Context('<bench>')
+    context.symbolTable = table
+    return context
+
+
+def timeVisit(interpreter, node):
+    context = freshContext()
+    start = time.perf_counter()
+    result = interpreter.visit(node, context)
+    elapsed = time.perf_counter() - start
+    if result.error:
+        raise SystemExit(result.error.asStr())
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    node = parse(LOOP.format(n=n))
+
+    print(f'{n} iterations')
+    base = timeVisit(src.Interpreter(hot_loop_threshold=None), node)
+    print(f'  Interpreter            {base * 1000:8.1f} ms')
+    for name, interpreter in (('BudgetInterpreter', src.BudgetInterpreter(10 ** 9)),
+                              ('SteppingInterpreter', src.SteppingInterpreter())):
+        elapsed = timeVisit(interpreter, node)
+        print(f'  {name:22} {elapsed * 1000:8.1f} ms  ({elapsed / base:.2f}x)')
+
+    short = parse(LOOP.format(n=50))
+    stepping = src.SteppingInterpreter()
+
+    start = time.perf_counter()
+    finished = []
+    for program in [node] + [short] * SHORT:
+        stepping.visit(program, freshContext())
+        finished.append(time.perf_counter() - start)
+    print(f'one long + {SHORT} short programs, quantum {QUANTUM} steps')
+    print(f'  in sequence          short ones done after {max(finished[1:]) * 1000:8.1f} ms')
+
+    # the loop round_robin() runs, noting when each program finishes
+    start = time.perf_counter()
+    executions = [stepping.start(program, freshContext()) for program in [node] + [short] * SHORT]
+    done = {}
+    pending = list(executions)
+    while pending:
+        execution = pending.pop(0)
+        if execution.resume(QUANTUM):
+            done[execution] = time.perf_counter() - start
+        else:
+            pending.append(execution)
+    print(f'  round robin          short ones done after {max(done[e] for e in executions[1:]) * 1000:8.1f} ms')
+
+    start = time.perf_counter()
+    round_robin([stepping.start(program, freshContext()) for program in [node] + [short] * SHORT], QUANTUM)
+    print(f'  all of them: {max(finished) * 1000:.1f} ms in sequence, {(time.perf_counter() - start) * 1000:.1f} ms round robin')
+
+
+if __name__ == '__main__':
+    main()
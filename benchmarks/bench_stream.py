@@ -0,0 +1,57 @@
+"""Lines per second through `swing.py batch` vs. piping into the REPL.
+
+    python benchmarks/bench_stream.py [lines]
+
+Input looks like a log-processing job: a handful of expression shapes
+over a running total, with varying literals.
+"""
+import os
+import random
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SWING = os.path.join(ROOT, 'swing.py')
+
+SHAPES = [
+    'yehai total = total + {a}',
+    'agar total > {b} phir total / {a} nahito total * 2',
+    'yehai hits = hits + (total > {b}) aur sach',
+    '{a} * {b} - total / ({a} + 1)',
+    'hits',
+]
+
+
+def makeInput(lines):
+    rng = random.Random(0)
+    body = ['yehai total = 0', 'yehai hits = 0']
+    for _ in range(lines - 2):
+        shape = rng.choice(SHAPES)
+        body.append(shape.format(a=rng.randint(1, 9), b=rng.randint(10, 500)))
+    return ('\n'.join(body) + '\n').encode()
+
+
+def timeCommand(args, data):
+    start = time.perf_counter()
+    done = subprocess.run([sys.executable, SWING] + args, input=data, stdout=subprocess.PIPE, check=True)
+    return time.perf_counter() - start, done.stdout
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    data = makeInput(lines)
+
+    replLines = max(lines // 10, 1)
+    replData = b'\n'.join(data.split(b'\n')[:replLines]) + b'\n'
+    repl, _ = timeCommand([], replData)
+    print(f'{"repl":18} {replLines / repl:10,.0f} lines/s')
+
+    for label, args in (('batch text', ['batch']),
+                        ('batch ndjson', ['batch', '--format', 'ndjson'])):
+        elapsed, output = timeCommand(args, data)
+        print(f'{label:18} {lines / elapsed:10,.0f} lines/s  ({len(output) / elapsed / 1e6:.1f} MB/s out)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Throughput of one shared Program run from a thread pool.
+
+    python benchmarks/bench_threads.py [runs]
+
+Each run evaluates a small loop with its own bindings. On a build with the
+GIL, pure-Python evaluation cannot run in parallel, so the interesting
+numbers there are that throughput holds steady as threads are added and
+that every result is still correct; on a free-threaded build the same
+script shows the scaling.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import src
+
+SOURCE = 'jabtak i < n phir (yehai s = s + i * k) + (yehai i = i + 1)'
+WORKERS = (1, 2, 4, 8)
+
+
+def expected(n, k):
+    return sum(i * k for i in range(n))
+
+
+def runOne(program, job):
+    n, k = job
+    variables = {'i': 0, 's': 0, 'n': n, 'k': k}
+    result = program.run_in(variables)
+    if result.error or variables['s'] != expected(n, k):
+        raise SystemExit(f'wrong result for n={n} k={k}')
+    return variables['s']
+
+
+def timePool(program, jobs, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in pool.map(lambda job: runOne(program, job), jobs, chunksize=64):
+            pass
+    return time.perf_counter() - start
+
+
+def timeFreshPipeline(jobs):
+    # what swing.py does per input: new lexer, parser, interpreter, table
+    start = time.perf_counter()
+    for n, k in jobs:
+        table = src.SymbolTable()
+        for name, value in (('i', 0), ('s', 0), ('n', n), ('k', k)):
+            table.set(name, src.Number(value))
+        context = src.Context('<program>')
+        context.symbolTable = table
+        ast = src.parse_stream(src.Lexer(SOURCE, '<program>'))
+        src.Interpreter().visit(ast.node, context)
+    return time.perf_counter() - start
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    jobs = [(20 + i % 13, i % 7) for i in range(runs)]
+    program = src.compile(SOURCE)
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'{runs} runs, {os.cpu_count()} CPUs, GIL {"enabled" if gil else "disabled"}')
+    fresh = timeFreshPipeline(jobs[:runs // 10]) * 10
+    print(f'  fresh pipeline per run  {runs / fresh:10,.0f} runs/s')
+    for workers in WORKERS:
+        elapsed = min(timePool(program, jobs, workers) for _ in range(3))
+        print(f'  shared Program, {workers} thread{"s" if workers > 1 else " "}  {runs / elapsed:10,.0f} runs/s')
+
+
+if __name__ == '__main__':
+    main()
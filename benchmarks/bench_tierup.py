@@ -0,0 +1,62 @@
+"""Hot jabtak loops on the generic interpreter vs. tiered up.
+
+    python benchmarks/bench_tierup.py [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import src
+
+WORKLOADS = {
+    'int counter': 'jabtak i < {n} phir yehai s = s + i * 2 + (yehai i = i + 1) * 0',
+    'branchy': ('jabtak i < {n} phir (yehai s = s + (agar i / 3 > 10 phir i nahito 0 - i)) '
+                '+ (yehai i = i + 1)'),
+    'nested': ('jabtak i < {n} / 10 phir agar (yehai j = 0) + (yehai i = i + 1) > 0 phir '
+               'jabtak j < 10 phir yehai s = s + j * (yehai j = j + 1)'),
+}
+
+
+def parse(text):
+    tokens, error = src.Lexer(text, '<bench>').getTokens()
+    if error: raise SystemExit(error.asStr())
+    ast = src.Parser(tokens).parse()
+    if ast.error: raise SystemExit(ast.error.asStr())
+    src.Resolver().resolve(ast.node)
+    return ast.node
+
+
+def timeLoop(program, threshold):
+    table = src.SymbolTable()
+    for name in 'isj':
+        table.set(name, src.Number(0))
+    context = src.Context('<bench>')
+    context.symbolTable = table
+
+    node = parse(program)
+    interpreter = src.Interpreter(hot_loop_threshold=threshold)
+    start = time.perf_counter()
+    result = interpreter.visit(node, context)
+    elapsed = time.perf_counter() - start
+    if result.error: raise SystemExit(result.error.asStr())
+    return elapsed, table.get('s').value, interpreter.tier_stats
+
+
+def bestOf(program, threshold, runs=3):
+    return min((timeLoop(program, threshold) for _ in range(runs)), key=lambda run: run[0])
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for name, program in WORKLOADS.items():
+        program = program.format(n=iterations)
+        generic, expected, _ = bestOf(program, None)
+        tiered, actual, stats = bestOf(program, src.interpreter.HOT_LOOP_THRESHOLD)
+        assert actual == expected, (name, actual, expected)
+        print(f'{name:12}  generic {generic:.3f}s  tiered {tiered:.4f}s  ({generic / tiered:.0f}x)  {stats}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Whole programs on Interpreter vs. transpiled to Python bytecode.
+
+    python benchmarks/bench_transpiler.py [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import src
+
+WORKLOADS = {
+    'int counter': 'jabtak i < {n} phir yehai s = s + i * 2 + (yehai i = i + 1) * 0',
+    'float branches': ('jabtak i < {n} phir (yehai s = s + (agar i / 3 > 10 phir i / 7 nahito 0 - i)) '
+                       '+ (yehai i = i + 1)'),
+    'nested': ('jabtak i < {n} / 10 phir agar (yehai j = 0) + (yehai i = i + 1) > 0 phir '
+               'jabtak j < 10 phir yehai s = s + j * (yehai j = j + 1)'),
+}
+
+BACKENDS = {
+    'interpreter': lambda: src.Interpreter(hot_loop_threshold=None),
+    'tier-up': src.Interpreter,
+    'transpiled': src.TranspiledInterpreter,
+}
+
+
+def parse(text):
+    tokens, error = src.Lexer(text, '<bench>').getTokens()
+    if error: raise SystemExit(error.asStr())
+    ast = src.Parser(tokens).parse()
+    if ast.error: raise SystemExit(ast.error.asStr())
+    src.Resolver().resolve(ast.node)
+    return ast.node
+
+
+def timeRun(program, backend):
+    table = src.SymbolTable()
+    for name in 'isj':
+        table.set(name, src.Number(0))
+    context = src.Context('<bench>')
+    context.symbolTable = table
+
+    node = parse(program)
+    start = time.perf_counter()
+    # compile time is included: transpiling is part of every run
+    result = backend().visit(node, context)
+    elapsed = time.perf_counter() - start
+    if result.error: raise SystemExit(result.error.asStr())
+    return elapsed, table.get('s').value
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for name, program in WORKLOADS.items():
+        program = program.format(n=iterations)
+        times = {}
+        results = set()
+        for backendName, backend in BACKENDS.items():
+            runs = [timeRun(program, backend) for _ in range(3)]
+            times[backendName] = min(elapsed for elapsed, _ in runs)
+            results.update(value for _, value in runs)
+        assert len(results) == 1, (name, results)
+
+        base = times['interpreter']
+        print(f'{name:15}' + ''.join(f'  {backendName} {elapsed:.4f}s ({base / elapsed:.0f}x)'
+                                     for backendName, elapsed in times.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Variable-heavy loops with name lookups vs. Resolver slots.
+
+    python benchmarks/bench_variables.py [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import src
+
+PROGRAM = ('jabtak i < {n} phir yehai i = i + 1 + 0 * '
+           '(yehai a = b + c) * (yehai b = c + a) * (yehai c = a - b + i)')
+
+
+def parse(text):
+    tokens, error = src.Lexer(text, '<bench>').getTokens()
+    if error: raise SystemExit(error.asStr())
+    ast = src.Parser(tokens).parse()
+    if ast.error: raise SystemExit(ast.error.asStr())
+    return ast.node
+
+
+def timeLoop(iterations, resolve):
+    table = src.SymbolTable()
+    for name in 'iabc':
+        table.set(name, src.Number(0))
+    context = src.Context('<bench>')
+    context.symbolTable = table
+
+    node = parse(PROGRAM.format(n=iterations))
+    if resolve:
+        src.Resolver().resolve(node)
+
+    start = time.perf_counter()
+    result = src.Interpreter(hot_loop_threshold=None).visit(node, context)
+    elapsed = time.perf_counter() - start
+    if result.error: raise SystemExit(result.error.asStr())
+    return elapsed
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    byName = min(timeLoop(iterations, False) for _ in range(5))
+    bySlot = min(timeLoop(iterations, True) for _ in range(5))
+    print(f'{iterations} iterations, 13 variable reads/writes each')
+    print(f'  name lookup : {byName:.3f}s')
+    print(f'  slot access : {bySlot:.3f}s  ({byName / bySlot:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Load generator for `swing.py serve`.
+
+    python benchmarks/loadgen.py [--requests N] [--concurrency C]
+                                 [--unix PATH | --port P | --workers W]
+                                 [--baseline K]
+
+Without an address it starts a server with --workers processes (default
+4) on a temporary Unix socket and stops it afterwards. C clients each keep
+one request in flight on their own connection (closed loop) until N
+requests have been answered; half of them use a session of their own, the
+rest run stateless. One request in
+fifty is a loop that outlives its budget, to show that it only delays its
+own client. Prints requests/s and p50/p99 latency, and with --baseline,
+the same figures for K requests each run as a `swing.py batch` subprocess.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SWING = os.path.join(ROOT, 'swing.py')
+
+SOURCES = [
+    'yehai n = {k} * 3 + 1',
+    '(n ya 0) * 2 + {k}',
+    'agar {k} > 5 phir {k} * {k} nahito {k} / 2',
+    'yehai i = 0\nyehai s = 0\njabtak i < 200 phir (yehai s = s + i) + (yehai i = i + 1)\ns',
+]
+SLOW = 'jabtak 1 phir 1'
+BUDGET = 0.5
+
+
+def request(number, session):
+    if number % 50 == 49:
+        payload = {'source': SLOW, 'budget': BUDGET}
+    else:
+        payload = {'source': SOURCES[number % len(SOURCES)].format(k=number % 10)}
+    payload['id'] = number
+    if session is not None:
+        payload['session'] = session
+    return payload
+
+
+def percentile(latencies, fraction):
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def client(open_connection, clientNo, counter, total, latencies, slow):
+    reader, writer = await open_connection()
+    session = f'client{clientNo}' if clientNo % 2 else None
+    while True:
+        number = next(counter)
+        if number >= total:
+            break
+        payload = request(number, session)
+        start = time.perf_counter()
+        writer.write(json.dumps(payload).encode() + b'\n')
+        response = json.loads(await reader.readline())
+        elapsed = time.perf_counter() - start
+        if response['id'] != number:
+            raise SystemExit(f'response for {response["id"]} to request {number}')
+        (slow if payload['source'] == SLOW else latencies).append(elapsed)
+    writer.close()
+
+
+async def drive(open_connection, total, concurrency):
+    counter = iter(range(total + concurrency))
+    latencies, slow = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(open_connection, n, counter, total, latencies, slow)
+                           for n in range(concurrency)))
+    return time.perf_counter() - start, latencies, slow
+
+
+def report(label, total, elapsed, latencies):
+    print(f'  {label:22} {total / elapsed:9,.0f} req/s   '
+          f'p50 {percentile(latencies, 0.50) * 1000:7.2f} ms   p99 {percentile(latencies, 0.99) * 1000:7.2f} ms')
+
+
+def baseline(count):
+    # what the server replaces: one process per request
+    latencies = []
+    start = time.perf_counter()
+    for number in range(count):
+        source = request(number, None)['source']
+        if source == SLOW:
+            continue
+        began = time.perf_counter()
+        subprocess.run([sys.executable, SWING, 'batch', '--format', 'ndjson'],
+                       input=source.encode(), stdout=subprocess.DEVNULL, check=True)
+        latencies.append(time.perf_counter() - began)
+    return time.perf_counter() - start, latencies
+
+
+def waitFor(path, process):
+    for _ in range(600):
+        if os.path.exists(path):
+            return
+        if process.poll() is not None:
+            raise SystemExit('server exited')
+        time.sleep(0.05)
+    raise SystemExit('server did not start')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--unix', metavar='PATH')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--workers', type=int, default=4, help='for the server this script starts')
+    parser.add_argument('--baseline', type=int, default=0, metavar='K')
+    args = parser.parse_args()
+
+    server = None
+    path = args.unix
+    if path is None and args.port is None:
+        path = os.path.join(tempfile.mkdtemp(), 'swing.sock')
+        server = subprocess.Popen([sys.executable, SWING, 'serve', '--unix', path,
+                                   '--workers', str(args.workers), '--budget', '5'])
+        waitFor(path, server)
+
+    if path:
+        open_connection = lambda: asyncio.open_unix_connection(path)
+    else:
+        open_connection = lambda: asyncio.open_connection(args.host, args.port)
+
+    try:
+        print(f'{args.requests} requests, {args.concurrency} clients, {os.cpu_count()} CPUs')
+        elapsed, latencies, slow = asyncio.run(drive(open_connection, args.requests, args.concurrency))
+        report('server', args.requests, elapsed, latencies)
+        if slow:
+            print(f'  {len(slow)} over-budget loops answered after {statistics.mean(slow) * 1000:.0f} ms on average')
+        if args.baseline:
+            elapsed, latencies = baseline(args.baseline)
+            report('subprocess per request', len(latencies), elapsed, latencies)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""Time-vs-size curves for generated programs, flagging anything super-linear.
+
+    python benchmarks/scaling.py [--shapes NAME,...] [--start N] [--max N]
+                                 [--tolerance X] [--seed N] [--backend NAME]
+                                 [--points]
+
+Each shape (random programs from src.generator.ProgramGenerator, and the
+long or deep families in src.generator.SHAPES) is built at doubling sizes
+n, and each size is lexed (Lexer.getTokens), parsed (Parser.parse_program)
+and evaluated. A stage's times are fitted against the work it did -- tokens
+for lexing and parsing, nodes evaluated for evaluation -- as
+time = c * work ** k, by least squares on a log-log scale. A stage is
+flagged when k is above 1 + tolerance, or when it fails with
+RecursionError, which also ends that shape. Exits with status 1 if
+anything was flagged.
+"""
+import argparse
+import math
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import src
+from src.generator import ProgramGenerator, SHAPES
+
+BACKENDS = {
+    'interpreter': src.Interpreter,
+    'iterative': src.IterativeInterpreter,
+    'vm': src.VM,
+    'closure': src.ClosureInterpreter,
+    'python': src.TranspiledInterpreter,
+}
+
+STAGES = ('lex', 'parse', 'evaluate')
+MIN_SAMPLE = 0.05
+COUNT_RECURSION_LIMIT = 10 ** 6
+COUNT_STACK_SIZE = 512 * 1024 * 1024
+
+
+def randomPrograms(seed):
+    # a new generator per size, so each size is the same program whatever
+    # sizes were asked for
+    return lambda n: ProgramGenerator(seed).program(n)
+
+
+def freshContext():
+    table = src.SymbolTable()
+    table.set('null', src.Number(0))
+    table.set('sach', src.Number(1))
+    table.set('jhut', src.Number(0))
+    context = src.Context('<scaling>')
+    context.symbolTable = table
+    return context
+
+
+def evaluate(backend, statements):
+    context = freshContext()
+    interpreter = backend()
+    for node in statements:
+        result = interpreter.visit(node, context)
+        if result.error:
+            raise SystemExit(f'generated program failed: {result.error.asStr()}')
+    return interpreter
+
+
+def countSteps(statements):
+    # nodes evaluated, as BudgetInterpreter counts them; it recurses, so it
+    # runs on a thread with room for deeper trees than the backend measured
+    counted = []
+
+    def count():
+        counter = src.BudgetInterpreter()
+        context = freshContext()
+        steps = 0
+        for node in statements:
+            counter.visit(node, context)
+            steps += counter.steps
+        counted.append(steps)
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, COUNT_RECURSION_LIMIT))
+    threading.stack_size(COUNT_STACK_SIZE)
+    try:
+        thread = threading.Thread(target=count)
+        thread.start()
+        thread.join()
+    finally:
+        threading.stack_size(0)
+        sys.setrecursionlimit(limit)
+    if not counted:
+        raise SystemExit('could not count the nodes evaluated')
+    return counted[0]
+
+
+def timeBest(run, repeat):
+    # seconds per run(), the best of repeat samples of at least MIN_SAMPLE
+    start = time.perf_counter()
+    run()
+    once = time.perf_counter() - start
+    loops = max(1, round(MIN_SAMPLE / once)) if once else 1000
+    best = once
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def measure(text, backend, repeat):
+    # {stage: (work, seconds)} for one program; a stage that raised
+    # RecursionError maps to None and the stages after it are left out
+    points = {}
+    try:
+        tokens, error = src.Lexer(text, '<scaling>').getTokens()
+        if error: raise SystemExit(f'generated program failed: {error.asStr()}')
+        points['lex'] = (len(tokens), timeBest(lambda: src.Lexer(text, '<scaling>').getTokens(), repeat))
+
+        ast = src.Parser(tokens).parse_program()
+        if ast.error: raise SystemExit(f'generated program failed: {ast.error.asStr()}')
+        points['parse'] = (len(tokens), timeBest(lambda: src.Parser(tokens).parse_program(), repeat))
+
+        statements = ast.node
+        resolver = src.Resolver()
+        for node in statements:
+            resolver.resolve(node)
+        seconds = timeBest(lambda: evaluate(backend, statements), repeat)
+        points['evaluate'] = (countSteps(statements), seconds)
+    except RecursionError:
+        points[next(stage for stage in STAGES if stage not in points)] = None
+    return points
+
+
+def exponent(points):
+    # slope of log(seconds) against log(work), None without three distinct sizes
+    points = [(math.log(work), math.log(seconds)) for work, seconds in points if work and seconds]
+    if len({x for x, _ in points}) < 3:
+        return None
+    meanX = sum(x for x, _ in points) / len(points)
+    meanY = sum(y for _, y in points) / len(points)
+    spread = sum((x - meanX) ** 2 for x, _ in points)
+    return sum((x - meanX) * (y - meanY) for x, y in points) / spread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--shapes', help=f'comma-separated, from: random, {", ".join(SHAPES)}')
+    parser.add_argument('--start', type=int, default=32, help='smallest n (default: %(default)s)')
+    parser.add_argument('--max', type=int, default=4096, help='largest n (default: %(default)s)')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='how far above 1 an exponent may be before it is flagged (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the random programs')
+    parser.add_argument('--backend', choices=BACKENDS, default='interpreter')
+    parser.add_argument('--repeat', type=int, default=3, help='timed samples per stage; the best is kept')
+    parser.add_argument('--points', action='store_true', help='print every size measured')
+    args = parser.parse_args()
+
+    shapes = {'random': randomPrograms(args.seed), **SHAPES}
+    if args.shapes:
+        unknown = set(args.shapes.split(',')) - set(shapes)
+        if unknown: parser.error(f'unknown shapes: {", ".join(sorted(unknown))}')
+        shapes = {name: shapes[name] for name in args.shapes.split(',')}
+
+    sizes = []
+    n = args.start
+    while n <= args.max:
+        sizes.append(n)
+        n *= 2
+
+    flagged = 0
+    print(f'{"shape":18} {"stage":9} {"n":>14} {"work":>18} {"exponent":>8}')
+    for name, build in shapes.items():
+        curves = {stage: [] for stage in STAGES}
+        failures = {}
+        for n in sizes:
+            points = measure(build(n), BACKENDS[args.backend], args.repeat)
+            for stage, point in points.items():
+                if point is None:
+                    failures[stage] = n
+                    continue
+                curves[stage].append((n, *point))
+                if args.points:
+                    work, seconds = point
+                    print(f'  {name} {stage} n={n}: {work} in {seconds * 1000:.3f} ms '
+                          f'({seconds / work * 1e6:.3f} us each)', flush=True)
+            if failures: break
+
+        for stage in STAGES:
+            curve = curves[stage]
+            k = exponent([(work, seconds) for _, work, seconds in curve])
+            line = f'{name:18} {stage:9} '
+            line += f'{curve[0][0]:>6}..{curve[-1][0]:<6} {curve[0][1]:>8}..{curve[-1][1]:<8}' if curve else f'{"-":>14} {"-":>18}'
+            line += f' {k:8.2f}' if k is not None else f' {"-":>8}'
+            if k is not None and k > 1 + args.tolerance:
+                line += '  SUPER-LINEAR'
+                flagged += 1
+            if stage in failures:
+                line += f'  RecursionError at n={failures[stage]}'
+                flagged += 1
+            print(line, flush=True)
+
+    if flagged:
+        print(f'{flagged} stage(s) flagged', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
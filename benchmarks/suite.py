@@ -0,0 +1,210 @@
+"""Benchmark suite with stored baselines and a regression threshold.
+
+    python benchmarks/suite.py [--only NAME,...] [--save] [--baseline PATH]
+                               [--threshold PERCENT] [--repeat N]
+
+Runs every case (lexer, parser and interpreter workloads), prints its
+throughput and, when a baseline file exists, the change against it. Exits
+with status 1 if any case is slower than its baseline by more than the
+threshold (default 10%). --save records this run as the new baseline.
+Baselines only compare like with like: record one per machine and Python
+build before relying on the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+
+import src
+from src.Parser import children
+from bench_lexer import makeSource
+from bench_parser import WORKLOADS as PARSER_WORKLOADS
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_THRESHOLD = 10.0
+NESTING = 250
+MIN_SAMPLE = 0.2
+
+
+def tokenize(text):
+    tokens, error = src.Lexer(text, '<bench>').getTokens()
+    if error: raise SystemExit(error.asStr())
+    return tokens
+
+
+def parse(text):
+    ast = src.Parser(tokenize(text)).parse()
+    if ast.error: raise SystemExit(ast.error.asStr())
+    src.Resolver().resolve(ast.node)
+    return ast.node
+
+
+def countNodes(node):
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(children(node))
+    return count
+
+
+# Each case returns (function to time, units of work it does, unit name).
+
+def lexerCase():
+    text = makeSource(256)
+    units = len(tokenize(text))
+    return (lambda: src.Lexer(text, '<bench>').getTokens()), units, 'tokens'
+
+
+def parserCase(build, terms):
+    def case():
+        tokens = tokenize(build(terms))
+        return (lambda: src.Parser(tokens).parse()), len(tokens), 'tokens'
+    return case
+
+
+def nestedCase():
+    # nested as deep as stays clear of the recursion limit
+    text = '(1 + ' * NESTING + '1' + ')' * NESTING
+    tokens = tokenize(text)
+
+    return (lambda: src.Parser(tokens).parse()), len(tokens), 'tokens'
+
+
+def evaluateCase(term, table, count=3000, perExpression=50):
+    # count terms, summed perExpression at a time: the tree-walker recurses
+    # once per term of a chain
+    texts = [' + '.join(term(i) for i in range(start, min(start + perExpression, count)))
+             for start in range(0, count, perExpression)]
+
+    def case():
+        nodes = [parse(text) for text in texts]
+        units = sum(countNodes(node) for node in nodes)
+
+        def run():
+            context = src.Context('<bench>')
+            context.symbolTable = src.SymbolTable()
+            for name, value in table.items():
+                context.symbolTable.set(name, src.Number(value))
+            interpreter = src.Interpreter()
+            for node in nodes:
+                result = interpreter.visit(node, context)
+                if result.error: raise SystemExit(result.error.asStr())
+        return run, units, 'nodes'
+    return case
+
+
+def loopCase(iterations, threshold):
+    text = f'jabtak i < {iterations} phir (yehai s = s + i * 2 - 1) + (yehai i = i + 1)'
+
+    def case():
+        node = parse(text)
+
+        def run():
+            context = src.Context('<bench>')
+            context.symbolTable = src.SymbolTable()
+            context.symbolTable.set('i', src.Number(0))
+            context.symbolTable.set('s', src.Number(0))
+            result = src.Interpreter(hot_loop_threshold=threshold).visit(node, context)
+            if result.error: raise SystemExit(result.error.asStr())
+        return run, iterations, 'iterations'
+    return case
+
+
+CASES = {
+    'lexer': lexerCase,
+    'parser/sum chain': parserCase(PARSER_WORKLOADS['sum chain'], 50000),
+    'parser/mixed precedence': parserCase(PARSER_WORKLOADS['mixed precedence'], 50000),
+    'parser/nested': nestedCase,
+    'interpreter/arithmetic': evaluateCase(lambda i: f'({i} * 3 - {i} / 2 + x)', {'x': 1}),
+    'interpreter/comparison': evaluateCase(lambda i: f'(x < {i}) + (x == {i}) + (x >= {i})', {'x': 500}),
+    'interpreter/agar': evaluateCase(lambda i: f'(agar x > {i} phir {i} nahito_agar x == {i} phir 0 nahito 1)', {'x': 700}),
+    'interpreter/jabtak': loopCase(20000, src.specializer.HOT_LOOP_THRESHOLD),
+    'interpreter/jabtak generic': loopCase(20000, None),
+}
+
+
+def measure(case, repeat):
+    run, units, unit = case()
+    # the warm-up run also sizes the samples: each one calls run() enough
+    # times to take MIN_SAMPLE seconds, so timer noise stays small
+    loops = max(1, round(MIN_SAMPLE / timeOnce(run, 1)))
+    best = min(timeOnce(run, loops) for _ in range(repeat))
+    return {'rate': units * loops / best, 'unit': f'{unit}/s'}
+
+
+def timeOnce(run, loops):
+    start = time.perf_counter()
+    for _ in range(loops):
+        run()
+    return time.perf_counter() - start
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', help='comma-separated case names or prefixes (lexer, parser, interpreter...)')
+    parser.add_argument('--save', action='store_true', help='write this run as the baseline')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline file (default: %(default)s)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='percent slower than baseline that counts as a regression (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per case; the best is kept')
+    args = parser.parse_args()
+
+    names = list(CASES)
+    if args.only:
+        wanted = args.only.split(',')
+        names = [name for name in names if any(name == w or name.startswith(w + '/') for w in wanted)]
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get('environment') != environment():
+            print(f'note: baseline was recorded on {baseline.get("environment")}', file=sys.stderr)
+
+    results = {}
+    regressions = []
+    for name in names:
+        result = results[name] = measure(CASES[name], args.repeat)
+        line = f'{name:28} {result["rate"]:14,.0f} {result["unit"]}'
+        previous = (baseline or {}).get('results', {}).get(name)
+        if previous:
+            change = (result['rate'] / previous['rate'] - 1) * 100
+            line += f'  {change:+6.1f}%'
+            if change < -args.threshold:
+                line += '  REGRESSION'
+                regressions.append(name)
+        print(line, flush=True)
+
+    if args.save:
+        if args.only and os.path.exists(args.baseline):
+            # keep the cases that were not run this time
+            with open(args.baseline) as file:
+                results = {**json.load(file).get('results', {}), **results}
+        with open(args.baseline, 'w') as file:
+            json.dump({'environment': environment(), 'results': results}, file, indent=2, sort_keys=True)
+            file.write('\n')
+        print(f'saved {args.baseline}')
+
+    if regressions:
+        print(f'{len(regressions)} case(s) more than {args.threshold:g}% slower than the baseline', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
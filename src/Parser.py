@@ -1,5 +1,5 @@
-from distutils.log import error
 from .errors import *
+import gc
 import string
 from .tokens import Token
 
@@ -23,6 +23,7 @@ TT_GTE      = 'GTE'
 TT_LTE      = 'LTE'
 TT_LPAREN   = 'LPAREN'
 TT_RPAREN   = 'RPAREN'
+TT_NEWLINE  = 'NEWLINE'
 TT_EOF      = 'EOF'
 
 KEYWORDS = [
@@ -37,95 +38,105 @@ KEYWORDS = [
     'jabtak'
 ]
 
+#######################################
+# VALUES
+#######################################
+
+# Numbers are immutable and carry no position or context: errors get those
+# attached by the evaluator, only once something actually goes wrong.
+# Small ints (including every comparison result) are shared instances.
+
+SMALL_INT_MIN = -5
+SMALL_INT_MAX = 256
+
 class Number:
-	def __init__(self, value):
-		self.value = value
-		self.set_pos()
-		self.set_context()
+	__slots__ = ('value',)
 
-	def set_pos(self, pos_start=None, pos_end=None):
-		self.pos_start = pos_start
-		self.pos_end = pos_end
+	def __new__(cls, value):
+		if type(value) is int and SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+			return SMALL_INTS[value - SMALL_INT_MIN]
+		self = object.__new__(cls)
+		self.value = value
 		return self
 
-	def set_context(self, context=None):
-		self.context = context
-		return self
+	def __getnewargs__(self):
+		return (self.value,)
 
 	def added_to(self, other):
 		if isinstance(other, Number):
-			return Number(self.value + other.value).set_context(self.context), None
+			return Number(self.value + other.value), None
 
 	def subbed_by(self, other):
 		if isinstance(other, Number):
-			return Number(self.value - other.value).set_context(self.context), None
+			return Number(self.value - other.value), None
 
 	def multed_by(self, other):
 		if isinstance(other, Number):
-			return Number(self.value * other.value).set_context(self.context), None
+			return Number(self.value * other.value), None
 
 	def dived_by(self, other):
 		if isinstance(other, Number):
 			if other.value == 0:
-				return None, RTError(
-					other.pos_start, other.pos_end,
-					'Division by zero',
-					self.context
-				)
+				# the evaluator knows where the divisor came from
+				return None, RTError(None, None, 'Division by zero', None)
 
-			return Number(self.value / other.value).set_context(self.context), None
+			return Number(self.value / other.value), None
 
 	def get_comparison_eq(self, other):
 		if isinstance(other, Number):
-			return Number(int(self.value == other.value)).set_context(self.context), None
+			return (TRUE if self.value == other.value else FALSE), None
 
 	def get_comparison_ne(self, other):
 		if isinstance(other, Number):
-			return Number(int(self.value != other.value)).set_context(self.context), None
+			return (TRUE if self.value != other.value else FALSE), None
 
 	def get_comparison_lt(self, other):
 		if isinstance(other, Number):
-			return Number(int(self.value < other.value)).set_context(self.context), None
+			return (TRUE if self.value < other.value else FALSE), None
 
 	def get_comparison_gt(self, other):
 		if isinstance(other, Number):
-			return Number(int(self.value > other.value)).set_context(self.context), None
+			return (TRUE if self.value > other.value else FALSE), None
 
 	def get_comparison_lte(self, other):
 		if isinstance(other, Number):
-			return Number(int(self.value <= other.value)).set_context(self.context), None
+			return (TRUE if self.value <= other.value else FALSE), None
 
 	def get_comparison_gte(self, other):
 		if isinstance(other, Number):
-			return Number(int(self.value >= other.value)).set_context(self.context), None
+			return (TRUE if self.value >= other.value else FALSE), None
 
 	def anded_by(self, other):
 		if isinstance(other, Number):
-			return Number(int(self.value and other.value)).set_context(self.context), None
+			return Number(int(self.value and other.value)), None
 
 	def ored_by(self, other):
 		if isinstance(other, Number):
-			return Number(int(self.value or other.value)).set_context(self.context), None
+			return Number(int(self.value or other.value)), None
 
 	def notted(self):
-		return Number(1 if self.value == 0 else 0).set_context(self.context), None
-
-	def copy(self):
-		copy = Number(self.value)
-		copy.set_pos(self.pos_start, self.pos_end)
-		copy.set_context(self.context)
-		return copy
+		return (TRUE if self.value == 0 else FALSE), None
 
 	def is_true(self):
 		return self.value != 0
- 
 
 	def __repr__(self):
 		return str(self.value)
 
+SMALL_INTS = []
+for _value in range(SMALL_INT_MIN, SMALL_INT_MAX + 1):
+	_number = object.__new__(Number)
+	_number.value = _value
+	SMALL_INTS.append(_number)
+SMALL_INTS = tuple(SMALL_INTS)
+
+TRUE = Number(1)
+FALSE = Number(0)
+
 class NumberNode:
 	def __init__(self, tok, pos_start, pos_end):
 		self.tok = tok
+		self.value = Number(tok.value)
 
 		self.pos_start = pos_start
 		self.pos_end = pos_end
@@ -137,9 +148,12 @@ class VarAccessNode:
     def __init__(self, varNameTok):
         self.var_name_tok = varNameTok
         
-        self.pos_start = self.var_name_tok
+        self.pos_start = self.var_name_tok.pos_start
         self.pos_end = self.var_name_tok.pos_end
 
+        # filled in by the Resolver
+        self.slot = None
+
 class VarAssignNode:
     def __init__(self, varNameTok, valueNode):
         self.var_name_tok = varNameTok
@@ -148,6 +162,9 @@ class VarAssignNode:
         self.pos_start = self.var_name_tok.pos_start
         self.pos_end = self.value_node.pos_end
 
+        # filled in by the Resolver
+        self.slot = None
+
 class BinOpNode:
 	def __init__(self, left_node, op_tok, right_node):
 		self.left_node = left_node
@@ -176,7 +193,7 @@ class IfNode():
         self.cases = cases
         self.else_case = else_case
         
-        self.pos = self.cases[0][0].pos_start
+        self.pos_start = self.cases[0][0].pos_start
         self.pos_end = (self.else_case or self.cases[len(self.cases)-1][0]).pos_end
 
 class WhileNode:
@@ -187,6 +204,27 @@ class WhileNode:
 		self.pos_start = self.condition_node.pos_start
 		self.pos_end = self.body_node.pos_end
 
+def value_span(node):
+	# where a value is reported in errors, e.g. when it is a zero divisor
+	while isinstance(node, VarAssignNode):
+		node = node.value_node
+	return node.pos_start, node.pos_end
+
+def children(node):
+	if isinstance(node, BinOpNode):
+		return (node.left_node, node.right_node)
+	if isinstance(node, UnaryOpNode):
+		return (node.node,)
+	if isinstance(node, VarAssignNode):
+		return (node.value_node,)
+	if isinstance(node, IfNode):
+		nodes = [n for case in node.cases for n in case]
+		if node.else_case: nodes.append(node.else_case)
+		return nodes
+	if isinstance(node, WhileNode):
+		return (node.condition_node, node.body_node)
+	return ()
+
 #######################################
 # PARSE RESULT
 #######################################
@@ -215,236 +253,271 @@ class ParseResult:
 # PARSER
 #######################################
 
+# Binary operator precedence, loosest first. All of them are left
+# associative; unary '+'/'-' bind tighter than any of them.
+PREC_LOGICAL    = 1
+PREC_COMPARISON = 2
+PREC_ARITH      = 3
+PREC_TERM       = 4
+
+PRECEDENCE = {
+	TT_EE: PREC_COMPARISON,
+	TT_NE: PREC_COMPARISON,
+	TT_LT: PREC_COMPARISON,
+	TT_GT: PREC_COMPARISON,
+	TT_LTE: PREC_COMPARISON,
+	TT_GTE: PREC_COMPARISON,
+	TT_PLUS: PREC_ARITH,
+	TT_MINUS: PREC_ARITH,
+	TT_MUL: PREC_TERM,
+	TT_DIV: PREC_TERM
+}
+
+KEYWORD_PRECEDENCE = {
+	'aur': PREC_LOGICAL,
+	'ya': PREC_LOGICAL
+}
+
+def parse_stream(lexer):
+	# Lexes and parses in one pass. A lexing error anywhere in the input
+	# wins over a parse error, as when the whole token list came first, so
+	# on a parse error the rest of the input is still scanned for one.
+	tokens = lexer.iterTokens()
+	res = Parser(tokens).parse()
+	if res.error and not lexer.error:
+		for _ in tokens: pass
+	if lexer.error:
+		return ParseResult().failure(lexer.error)
+	return res
+
 class Parser:
+	# parse() is the public entry point and returns a ParseResult. The
+	# grammar methods below it return bare nodes and raise ErrorSignal on
+	# a syntax error.
 	def __init__(self, tokens):
-		self.tokens = tokens
-		self.tok_idx = -1
+		# any iterable of tokens ending in EOF; a list works as well as
+		# Lexer.iterTokens(). The grammar is LL(1), so current_tok is the
+		# whole lookahead and nothing behind it is kept alive.
+		self.tokens = iter(tokens)
+		self.current_tok = None
 		self.advance()
 
 	def advance(self, ):
-		self.tok_idx += 1
-		if self.tok_idx < len(self.tokens):
-			self.current_tok = self.tokens[self.tok_idx]
+		tok = next(self.tokens, None)
+		if tok is not None:
+			self.current_tok = tok
 		return self.current_tok
 
+	def syntax_error(self, details):
+		return ErrorSignal(InvalidSyntaxError(
+			self.current_tok.pos_start, self.current_tok.pos_end,
+			details
+		))
+
 	def parse(self):
-		res = self.expr()
-		if not res.error and self.current_tok.type != TT_EOF:
-			return res.failure(InvalidSyntaxError(
-				self.current_tok.pos_start, self.current_tok.pos_end,
-				"Expected '+', '-', '*' or '/'"
-			))
-		return res
+		res = ParseResult()
+		# The AST is acyclic, so cyclic GC passes over it while it grows are
+		# pure overhead (about half the parse time on long inputs).
+		gc_enabled = gc.isenabled()
+		gc.disable()
+		try:
+			node = self.expr()
+			if self.current_tok.type != TT_EOF:
+				raise self.syntax_error("Expected '+', '-', '*' or '/'")
+		except ErrorSignal as signal:
+			return res.failure(signal.error)
+		finally:
+			if gc_enabled: gc.enable()
+
+		return res.success(node)
+
+	def parse_program(self):
+		# A whole file: expressions separated by newlines, blank lines
+		# allowed. The node is the list of top-level expressions.
+		res = ParseResult()
+		statements = []
+		gc_enabled = gc.isenabled()
+		gc.disable()
+		try:
+			while True:
+				while self.current_tok.type == TT_NEWLINE:
+					self.advance()
+				if self.current_tok.type == TT_EOF:
+					break
+				statements.append(self.expr())
+				if self.current_tok.type != TT_NEWLINE and self.current_tok.type != TT_EOF:
+					raise self.syntax_error("Expected '+', '-', '*' or '/'")
+		except ErrorSignal as signal:
+			return res.failure(signal.error)
+		finally:
+			if gc_enabled: gc.enable()
+
+		return res.success(statements)
 
 	###################################
  
 	def if_expr(self):
-		res = ParseResult()
 		cases = []
 		else_case = None
 
 		if not self.current_tok.matches(TT_KEYWORD, 'agar'):
-			return res.failure(InvalidSyntaxError(
-				self.current_tok.pos_start, self.current_tok.pos_end,
-				f"Expected 'IF'"
-			))
-
-		res.register(self.advance())
+			raise self.syntax_error(f"Expected 'IF'")
 
+		self.advance()
 
-		condition = res.register(self.expr())
-		if res.error: return res
+		condition = self.expr()
 
 		if not self.current_tok.matches(TT_KEYWORD, 'phir'):
-			return res.failure(InvalidSyntaxError(
-				self.current_tok.pos_start, self.current_tok.pos_end,
-				f"Expected 'THEN'"
-			))
+			raise self.syntax_error(f"Expected 'THEN'")
 
-		res.register(self.advance())
+		self.advance()
 
-		expr = res.register(self.expr())
-		if res.error: return res
+		expr = self.expr()
 		cases.append((condition, expr))
 
 		while self.current_tok.matches(TT_KEYWORD, 'nahito_agar'):
-			res.register(self.advance())
+			self.advance()
 
-			condition = res.register(self.expr())
-			if res.error: return res
+			condition = self.expr()
 
 			if not self.current_tok.matches(TT_KEYWORD, 'phir'):
-				return res.failure(InvalidSyntaxError(
-					self.current_tok.pos_start, self.current_tok.pos_end,
-					f"Expected 'THEN'"
-				))
+				raise self.syntax_error(f"Expected 'THEN'")
 
-			res.register(self.advance())
+			self.advance()
 
-			expr = res.register(self.expr())
-			if res.error: return res
+			expr = self.expr()
 			cases.append((condition, expr))
 
 		if self.current_tok.matches(TT_KEYWORD, 'nahito'):
-			res.register(self.advance())
+			self.advance()
 
-			else_case = res.register(self.expr())
-			if res.error: return res
+			else_case = self.expr()
 
-		return res.success(IfNode(cases, else_case))
+		return IfNode(cases, else_case)
 
 	def while_expr(self):
-		res = ParseResult()
-
 		if not self.current_tok.matches(TT_KEYWORD, 'jabtak'):
-			return res.failure(InvalidSyntaxError(
-				self.current_tok.pos_start, self.current_tok.pos_end,
-				f"Expected 'jabtak'"
-			))
-
-		res.register(self.advance())
+			raise self.syntax_error(f"Expected 'jabtak'")
 
+		self.advance()
 
-		condition = res.register(self.expr())
-		if res.error: return res
+		condition = self.expr()
 
 		if not self.current_tok.matches(TT_KEYWORD, 'phir'):
-			return res.failure(InvalidSyntaxError(
-				self.current_tok.pos_start, self.current_tok.pos_end,
-				f"Expected 'phir'"
-			))
-
-		res.register(self.advance())
-
-		body = res.register(self.expr())
-		if res.error: return res
+			raise self.syntax_error(f"Expected 'phir'")
 
-		return res.success(WhileNode(condition, body))
-
-	def factor(self):
-		res = ParseResult()
-		tok = self.current_tok
-
-		if tok.type in (TT_PLUS, TT_MINUS):
-			res.register(self.advance())
-			factor = res.register(self.factor())
-			if res.error: return res
-			return res.success(UnaryOpNode(tok, factor))
-
-		elif tok.type == TT_IDENTIFIER:
-			res.register(self.advance())
-			return res.success(VarAccessNode(tok))
-
-		
-		elif tok.type in (TT_INT, TT_FLOAT):
-			res.register(self.advance())
-			return res.success(NumberNode(tok, tok.pos_start, tok.pos_end))
-
-		elif tok.type == TT_LPAREN:
-			res.register(self.advance())
-			expr = res.register(self.expr())
-			if res.error: return res
-			if self.current_tok.type == TT_RPAREN:
-				res.register(self.advance())
-				return res.success(expr)
-			else:
-				return res.failure(InvalidSyntaxError(
-					self.current_tok.pos_start, self.current_tok.pos_end,
-					"Expected ')'"
-				))
-		elif tok.matches(TT_KEYWORD, 'agar'):
-			if_expr = res.register(self.if_expr())
-			if res.error:return error
-			return res.success(if_expr)
-
-		elif tok.matches(TT_KEYWORD, 'jabtak'):
-			while_expr = res.register(self.while_expr())
-			if res.error: return res
-			return res.success(while_expr)
-
-		return res.failure(InvalidSyntaxError(
-			tok.pos_start, tok.pos_end,
-			"Expected int, float, identifier, '+', etc"
-		))
-
-	def term(self):
-		return self.bin_op(self.factor, (TT_MUL, TT_DIV))
-
-	def arith_expr(self):
-		return self.bin_op(self.term, (TT_PLUS, TT_MINUS))
-
-	def comp_expr(self):
-		res = ParseResult()
+		self.advance()
 
-		if self.current_tok.matches(TT_KEYWORD, 'na'):
-			op_tok = self.current_tok
-			res.register(self.advance())
-
-			node = res.register(self.comp_expr())
-			if res.error: return res
-			return res.success(UnaryOpNode(op_tok, node))
-		
-		node = res.register(self.bin_op(self.arith_expr, (TT_EE, TT_NE, TT_LT, TT_GT, TT_LTE, TT_GTE)))
-		
-		if res.error:
-			return res.failure(InvalidSyntaxError(
-				self.current_tok.pos_start, self.current_tok.pos_end,
-				"Expected int, float, identifier, '+', '-', '(' or 'NOT'"
-			))
+		body = self.expr()
 
-		return res.success(node)
+		return WhileNode(condition, body)
 
 	def expr(self):
-		res = ParseResult()
+		# A leading run of assignments and loops, as in 'yehai t = yehai t =
+		# ...' or 'jabtak c phir jabtak c phir ...', is read in a loop and
+		# nested once the innermost expression is parsed, so it takes no
+		# Python stack however long it is. Errors are those the recursive
+		# grammar gives: past a jabtak, every one is the generic message.
+		frames = []         # (node class, variable or condition), outermost first
+		specific = True
+		try:
+			while True:
+				if self.current_tok.matches(TT_KEYWORD, 'yehai'):
+					self.advance()
+
+					if self.current_tok.type != TT_IDENTIFIER:
+						raise self.syntax_error("Expected identifier")
+
+					var_name = self.current_tok
+					self.advance()
+
+					if self.current_tok.type != TT_EQ:
+						raise self.syntax_error("Expected '='")
+
+					self.advance()
+					frames.append((VarAssignNode, var_name))
+
+				elif self.current_tok.matches(TT_KEYWORD, 'jabtak'):
+					specific = False
+					self.advance()
+
+					condition = self.expr()
+
+					if not self.current_tok.matches(TT_KEYWORD, 'phir'):
+						raise self.syntax_error(f"Expected 'phir'")
+
+					self.advance()
+					frames.append((WhileNode, condition))
+
+				else:
+					break
+
+			# a loop's body takes every operator after it, so nothing can
+			# follow the innermost expression here that bin_expr would take
+			specific = False
+			node = self.bin_expr(0)
+		except ErrorSignal:
+			if specific: raise
+			raise self.syntax_error(
+				"Expected 'VAR', int, float, identifier, '+', '-', '(' or 'NOT'"
+			) from None
 
-		if self.current_tok.matches(TT_KEYWORD, 'yehai'):
-			res.register(self.advance())
+		for node_class, first in reversed(frames):
+			node = node_class(first, node)
+		return node
 
-			if self.current_tok.type != TT_IDENTIFIER:
-				return res.failure(InvalidSyntaxError(
-					self.current_tok.pos_start, self.current_tok.pos_end,
-					"Expected identifier"
-				))
+	###################################
 
-			var_name = self.current_tok
-			res.register(self.advance())
+	def bin_expr(self, min_prec):
+		# Pratt loop: parse one operand (prefix operators included), then
+		# absorb every binary operator that binds tighter than min_prec.
+		tok = self.current_tok
+		tok_type = tok.type
 
-			if self.current_tok.type != TT_EQ:
-				return res.failure(InvalidSyntaxError(
-					self.current_tok.pos_start, self.current_tok.pos_end,
-					"Expected '='"
-				))
+		if tok_type == TT_INT or tok_type == TT_FLOAT:
+			self.advance()
+			left = NumberNode(tok, tok.pos_start, tok.pos_end)
 
-			res.register(self.advance())
-			expr = res.register(self.expr())
-			if res.error: return res
-			return res.success(VarAssignNode(var_name, expr))
+		elif tok_type == TT_IDENTIFIER:
+			self.advance()
+			left = VarAccessNode(tok)
 
-		node = res.register(self.bin_op(self.comp_expr, ((TT_KEYWORD, 'aur'), (TT_KEYWORD, 'ya'))))
+		elif tok_type == TT_PLUS or tok_type == TT_MINUS:
+			self.advance()
+			left = UnaryOpNode(tok, self.bin_expr(PREC_TERM))
 
-		if res.error:
-			return res.failure(InvalidSyntaxError(
-				self.current_tok.pos_start, self.current_tok.pos_end,
-				"Expected 'VAR', int, float, identifier, '+', '-', '(' or 'NOT'"
-			))
+		elif tok_type == TT_LPAREN:
+			self.advance()
+			left = self.expr()
+			if self.current_tok.type != TT_RPAREN:
+				raise self.syntax_error("Expected ')'")
+			self.advance()
 
-		return res.success(node)
+		elif tok.matches(TT_KEYWORD, 'na') and min_prec < PREC_COMPARISON:
+			# 'na' negates a whole comparison, so it may only open an
+			# operand of 'aur'/'ya' or an entire expression
+			self.advance()
+			left = UnaryOpNode(tok, self.bin_expr(PREC_LOGICAL))
 
-	###################################
+		elif tok.matches(TT_KEYWORD, 'agar'):
+			left = self.if_expr()
 
-	def bin_op(self, func_a, ops, func_b=None):
-		if func_b == None:
-			func_b = func_a
-		
-		res = ParseResult()
-		left = res.register(func_a())
-		if res.error: return res
+		elif tok.matches(TT_KEYWORD, 'jabtak'):
+			left = self.while_expr()
+
+		else:
+			raise self.syntax_error("Expected int, float, identifier, '+', etc")
 
-		while self.current_tok.type in ops or (self.current_tok.type, self.current_tok.value) in ops:
+		while True:
 			op_tok = self.current_tok
-			res.register(self.advance())
-			right = res.register(func_b())
-			if res.error: return res
-			left = BinOpNode(left, op_tok, right)
+			if op_tok.type == TT_KEYWORD:
+				prec = KEYWORD_PRECEDENCE.get(op_tok.value)
+			else:
+				prec = PRECEDENCE.get(op_tok.type)
+			if prec is None or prec <= min_prec:
+				break
+
+			self.advance()
+			left = BinOpNode(left, op_tok, self.bin_expr(prec))
 
-		return res.success(left)
\ No newline at end of file
+		return left
\ No newline at end of file
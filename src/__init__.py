@@ -1,6 +1,26 @@
-from .Parser import Parser
+__version__ = '0.1.0'
+
+from .Parser import Parser, parse_stream
 from .lexer import Lexer
 from .symbolTable import SymbolTable
 from .interpreter import Interpreter
 from .context import Context
-from .Parser import Number
\ No newline at end of file
+from .Parser import Number
+from .compiler import Compiler
+from .vm import VM
+from .closures import ClosureCompiler, ClosureInterpreter
+from .optimizer import Optimizer
+from .resolver import Resolver
+from .specializer import TierStats
+from .transpiler import Transpiler, TranspiledInterpreter
+from .vectorized import BatchInterpreter
+from .program import compile, Program
+from .cache import ProgramCache
+from .parallel import BatchRunner
+from .dataflow import DataflowScheduler
+from .server import Server
+from .budget import BudgetInterpreter, SteppingInterpreter, round_robin
+from .profiler import ProfilingInterpreter
+from .allocations import AllocationTracker
+from .generator import ProgramGenerator
+from .iterative import IterativeInterpreter
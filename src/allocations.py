@@ -0,0 +1,175 @@
+import gc
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from .Parser import *
+from .position import Position
+from .tokens import Token
+from .rtresult import RTResult
+from .context import Context
+from .symbolTable import SymbolTable
+
+TRACKED = (
+	Token, Position, ParseResult, RTResult, Number,
+	NumberNode, VarAccessNode, VarAssignNode, BinOpNode, UnaryOpNode, IfNode, WhileNode,
+	Context, SymbolTable
+)
+
+# Instances handed out again instead of allocated; not counted
+SHARED = {Number: SMALL_INTS}
+
+def instance_size(obj):
+	size = sys.getsizeof(obj)
+	if hasattr(obj, '__dict__'):
+		size += sys.getsizeof(obj.__dict__)
+	return size
+
+#######################################
+# PHASE STATS
+#######################################
+
+class KindStats:
+	__slots__ = ('allocations', 'size', 'live', 'live_bytes')
+
+	def __init__(self):
+		self.allocations = 0    # instances created during the phase
+		self.size = 0           # bytes per instance, object and __dict__
+		self.live = 0           # instances alive when the phase ended
+		self.live_bytes = 0
+
+class PhaseStats:
+	def __init__(self, name, kinds, traced, peak, sites):
+		self.name = name
+		self.kinds = kinds      # class name -> KindStats
+		self.traced = traced    # net bytes traced by tracemalloc over the phase
+		self.peak = peak        # highest traced bytes above the start of the phase
+		self.sites = sites      # [(file:line, bytes, blocks)], largest first
+
+#######################################
+# ALLOCATION TRACKER
+#######################################
+
+# Counts the instances of the pipeline's own classes created in each phase
+# (the classes' __new__ is wrapped while the tracker is started, so the
+# count is exact and cheap) and measures each phase with tracemalloc: net
+# and peak bytes, and the source lines allocating the most. Bytes per
+# class are worked out from instance sizes, since tracemalloc sees
+# allocation sites, not types.
+
+class AllocationTracker:
+	def __init__(self, kinds=TRACKED, top_sites=5):
+		self.kinds = kinds
+		self.top_sites = top_sites
+		self.counts = dict.fromkeys(kinds, 0)
+		self.sizes = {}
+		self.phases = []
+		self.patched = []
+		self.started_tracing = False
+		self.snapshot = None
+		self.baseline = 0
+
+	def start(self):
+		if not tracemalloc.is_tracing():
+			tracemalloc.start()
+			self.started_tracing = True
+		for cls in self.kinds:
+			self.patch(cls)
+
+	def stop(self):
+		for cls, original in reversed(self.patched):
+			if original is None:
+				del cls.__new__
+			else:
+				cls.__new__ = original
+		self.patched = []
+		if self.started_tracing:
+			tracemalloc.stop()
+			self.started_tracing = False
+
+	def __enter__(self):
+		self.start()
+		return self
+
+	def __exit__(self, *exc_info):
+		self.stop()
+
+	def patch(self, cls):
+		counts = self.counts
+		sizes = self.sizes
+		original = cls.__dict__.get('__new__')
+		shared = {id(obj) for obj in SHARED.get(cls, ())}
+		create = original.__func__ if isinstance(original, staticmethod) else original
+
+		def __new__(klass, *args, **kwargs):
+			obj = create(klass, *args, **kwargs) if create else object.__new__(klass)
+			if id(obj) not in shared:
+				counts[cls] += 1
+				# one instance per class is kept as the sample for its size
+				if cls not in sizes: sizes[cls] = obj
+			return obj
+
+		cls.__new__ = staticmethod(__new__)
+		self.patched.append((cls, original))
+
+	###################################
+
+	def begin(self):
+		for cls in self.counts:
+			self.counts[cls] = 0
+		self.snapshot = tracemalloc.take_snapshot()
+		tracemalloc.reset_peak()
+		self.baseline = tracemalloc.get_traced_memory()[0]
+
+	def end(self, name):
+		current, peak = tracemalloc.get_traced_memory()
+		ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+		snapshot = tracemalloc.take_snapshot().filter_traces(ignore)
+		sites = []
+		diffs = snapshot.compare_to(self.snapshot.filter_traces(ignore), 'lineno')
+		for diff in sorted(diffs, key=lambda diff: diff.size_diff, reverse=True)[:self.top_sites]:
+			if diff.size_diff <= 0: break
+			frame = diff.traceback[0]
+			sites.append((f'{frame.filename}:{frame.lineno}', diff.size_diff, diff.count_diff))
+		self.snapshot = None
+
+		live = dict.fromkeys(self.kinds, 0)
+		shared = {id(obj) for objects in SHARED.values() for obj in objects}
+		for obj in gc.get_objects():
+			cls = type(obj)
+			if cls in live and id(obj) not in shared:
+				live[cls] += 1
+
+		# only the classes this phase allocated; live counts are for all of
+		# their instances, whichever phase made them
+		kinds = {}
+		for cls in self.kinds:
+			if not self.counts[cls]: continue
+			stats = kinds[cls.__name__] = KindStats()
+			stats.allocations = self.counts[cls]
+			stats.size = instance_size(self.sizes[cls])
+			stats.live = live[cls]
+			stats.live_bytes = stats.live * stats.size
+		self.phases.append(PhaseStats(name, kinds, current - self.baseline, peak - self.baseline, sites))
+
+	@contextmanager
+	def phase(self, name):
+		self.begin()
+		try:
+			yield
+		finally:
+			self.end(name)
+
+	###################################
+
+	def summary(self):
+		lines = []
+		for phase in self.phases:
+			lines.append(f'{phase.name}: {phase.traced:+,} bytes net, {phase.peak:,} bytes peak')
+			if phase.kinds:
+				lines.append(f"  {'kind':16} {'allocated':>10} {'bytes':>12} {'live':>9} {'live bytes':>12}")
+			for kind, stats in sorted(phase.kinds.items(), key=lambda item: item[1].allocations * item[1].size, reverse=True):
+				lines.append(f'  {kind:16} {stats.allocations:10,} {stats.allocations * stats.size:12,} '
+					f'{stats.live:9,} {stats.live_bytes:12,}')
+			for site, size, count in phase.sites:
+				lines.append(f'  {size:+12,} bytes {count:+9,} blocks  {site}')
+		return '\n'.join(lines) + '\n'
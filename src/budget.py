@@ -0,0 +1,208 @@
+from collections import deque
+from .Parser import *
+from .errors import *
+from .rtresult import RTResult
+from .interpreter import Interpreter
+from .closures import BINARY_METHODS
+
+def budget_error(node, context, budget):
+	return RTError(node.pos_start, node.pos_end, f'Instruction budget of {budget} steps exceeded', context)
+
+#######################################
+# BUDGET INTERPRETER
+#######################################
+
+# The tree-walking interpreter, counting every node it evaluates. A
+# visit() that would evaluate more than budget nodes stops with an RTError
+# at the node that went over, leaving the symbol table as the steps before
+# it left it. Loops are never handed to the specializer, whose code would
+# run uncounted; Interpreter itself keeps the cost of counting off its
+# own path.
+
+class BudgetInterpreter(Interpreter):
+	def __init__(self, budget=None):
+		super().__init__(hot_loop_threshold=None)
+		self.budget = budget
+		self.steps = 0      # nodes evaluated by the last visit()
+
+	def visit(self, node, context):
+		self.steps = 0
+		return super().visit(node, context)
+
+	def evaluate(self, node, context):
+		steps = self.steps = self.steps + 1
+		if self.budget is not None and steps > self.budget:
+			raise ErrorSignal(budget_error(node, context, self.budget))
+		method = self.methods.get(type(node))
+		if method is None:
+			method = self.methods[type(node)] = getattr(self, f'visit_{type(node).__name__}', self.no_visit_method)
+		return method(node, context)
+
+#######################################
+# STEPPING INTERPRETER
+#######################################
+
+# Evaluates a tree as a stack of generators, one per node being evaluated,
+# each yielding once as its node is entered. start() returns an Execution
+# that runs a given number of those steps at a time and can be resumed
+# where it stopped, so one thread can interleave any number of programs
+# (see round_robin()). Steps are counted exactly as BudgetInterpreter
+# counts them, and the values, errors and table updates are the
+# interpreter's.
+
+class SteppingInterpreter:
+	def __init__(self, budget=None):
+		self.budget = budget
+		self.methods = {}
+
+	def visit(self, node, context):
+		execution = self.start(node, context)
+		execution.resume()
+		return execution.result
+
+	def start(self, node, context):
+		return Execution(self.walk(node, context), context, self.budget)
+
+	def walk(self, node, context):
+		# the generator evaluating node
+		method = self.methods.get(type(node))
+		if method is None:
+			method_name = f'walk_{type(node).__name__}'
+			method = self.methods[type(node)] = getattr(self, method_name, self.no_walk_method)
+		return method(node, context)
+
+	def no_walk_method(self, node, context):
+		raise Exception(f'No walk_{type(node).__name__} method defined')
+
+	###################################
+
+	def walk_NumberNode(self, node, context):
+		yield node
+		return node.value
+
+	def walk_VarAccessNode(self, node, context):
+		yield node
+		var_name = node.var_name_tok.value
+		table = context.symbolTable
+		slot = node.slot
+		values = table.values
+		value = values[slot] if slot is not None and slot < len(values) else None
+		if value is None:
+			value = table.get(var_name)
+
+		if not value:
+			raise ErrorSignal(RTError(
+				node.pos_start, node.pos_end,
+				f"'{var_name}' is not defined",
+				context
+			))
+		return value
+
+	def walk_VarAssignNode(self, node, context):
+		yield node
+		var_name = node.var_name_tok.value
+		value = yield from self.walk(node.value_node, context)
+
+		slot = node.slot
+		values = context.symbolTable.values
+		if slot is not None and slot < len(values):
+			values[slot] = value
+		else:
+			context.symbolTable.set(var_name, value)
+		return value
+
+	def walk_BinOpNode(self, node, context):
+		yield node
+		left = yield from self.walk(node.left_node, context)
+		right = yield from self.walk(node.right_node, context)
+
+		op_tok = node.op_tok
+		op = BINARY_METHODS[op_tok.type] if op_tok.type != TT_KEYWORD else BINARY_METHODS[(op_tok.type, op_tok.value)]
+		result, error = op(left, right)
+		if error:
+			pos_start, pos_end = value_span(node.right_node)
+			raise ErrorSignal(error.set_pos(pos_start, pos_end).set_context(context))
+		return result
+
+	def walk_UnaryOpNode(self, node, context):
+		yield node
+		number = yield from self.walk(node.node, context)
+		error = None
+
+		if node.op_tok.type == TT_MINUS:
+			number, error = number.multed_by(Number(-1))
+		elif node.op_tok.matches(TT_KEYWORD, 'na'):
+			number, error = number.notted()
+
+		if error:
+			raise ErrorSignal(error)
+		return number
+
+	def walk_IfNode(self, node, context):
+		yield node
+		for condition, expr in node.cases:
+			condition_value = yield from self.walk(condition, context)
+			if condition_value.is_true():
+				return (yield from self.walk(expr, context))
+
+		if node.else_case:
+			return (yield from self.walk(node.else_case, context))
+		return None
+
+	def walk_WhileNode(self, node, context):
+		yield node
+		while True:
+			condition_value = yield from self.walk(node.condition_node, context)
+			if not condition_value.is_true(): break
+			yield from self.walk(node.body_node, context)
+		return None
+
+#######################################
+# EXECUTION
+#######################################
+
+class Execution:
+	def __init__(self, generator, context, budget=None):
+		self.generator = generator
+		self.context = context
+		self.budget = budget
+		self.steps = 0          # nodes entered so far
+		self.result = None      # RTResult once finished
+
+	@property
+	def done(self):
+		return self.result is not None
+
+	def resume(self, steps=None):
+		# Runs up to steps more nodes, or to the end when steps is None.
+		# Returns True once the program has finished.
+		if self.result is not None:
+			return True
+		res = RTResult()
+		generator = self.generator
+		budget = self.budget
+		limit = None if steps is None else self.steps + steps
+
+		try:
+			while limit is None or self.steps < limit:
+				node = next(generator)
+				self.steps += 1
+				if budget is not None and self.steps > budget:
+					generator.close()
+					self.result = res.failure(budget_error(node, self.context, budget))
+					return True
+		except StopIteration as stop:
+			self.result = res.success(stop.value)
+		except ErrorSignal as signal:
+			self.result = res.failure(signal.error)
+		return self.result is not None
+
+def round_robin(executions, quantum=1000):
+	# Time-slices executions on this thread, quantum steps each in turn,
+	# until all have finished; returns their RTResults in the same order.
+	queue = deque(executions)
+	while queue:
+		execution = queue.popleft()
+		if not execution.resume(quantum):
+			queue.append(execution)
+	return [execution.result for execution in executions]
@@ -0,0 +1,156 @@
+import hashlib
+import importlib.util
+import marshal
+import os
+import threading
+from collections import OrderedDict
+from . import __version__
+from .program import compile, load_program
+
+# Cache files start with this, then marshal data; a different Python
+# bytecode version or file format makes every old file a miss.
+MAGIC = b'SWC\x02' + importlib.util.MAGIC_NUMBER
+SUFFIX = '.swc'
+
+def cache_key(source, fn):
+	text = f'{__version__}\0{fn}\0{source}'
+	return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+#######################################
+# CACHE STATS
+#######################################
+
+class CacheStats:
+	def __init__(self):
+		self.hits = 0        # served from memory
+		self.disk_hits = 0   # loaded from a cache file instead of compiling
+		self.preloaded = 0   # loaded from cache files when the cache was created
+		self.misses = 0      # compiled from source
+		self.evictions = 0   # dropped from memory to respect maxsize
+		self.disk_writes = 0
+		self.invalid = 0     # cache files rejected while validating
+
+	def __repr__(self):
+		return (f'CacheStats(hits={self.hits}, disk_hits={self.disk_hits}, preloaded={self.preloaded}, misses={self.misses}, '
+			f'evictions={self.evictions}, disk_writes={self.disk_writes}, invalid={self.invalid})')
+
+#######################################
+# PROGRAM CACHE
+#######################################
+
+# Two tiers in front of compile(): an LRU of Programs in memory, bounded by
+# maxsize, and optionally a directory of cache files holding each
+# program's Program.to_bytes() (its code object marshalled as in a .pyc,
+# with its source and error positions). With a directory, the newest
+# files are validated and loaded when the cache is created, so a restarted
+# process skips lexing and parsing for them. Safe to share between threads.
+
+class ProgramCache:
+	def __init__(self, maxsize=256, directory=None):
+		self.maxsize = maxsize
+		self.directory = directory
+		self.programs = OrderedDict()
+		self.lock = threading.Lock()
+		self.stats = CacheStats()
+
+		if directory:
+			os.makedirs(directory, exist_ok=True)
+			self.preload()
+
+	def compile(self, source, fn='<program>'):
+		key = cache_key(source, fn)
+		with self.lock:
+			program = self.programs.get(key)
+			if program is not None:
+				self.programs.move_to_end(key)
+				self.stats.hits += 1
+				return program
+
+		program = self.load(key, source, fn) if self.directory else None
+		if program is not None:
+			with self.lock: self.stats.disk_hits += 1
+		else:
+			# CompileError propagates; invalid sources are not cached
+			program = compile(source, fn)
+			with self.lock: self.stats.misses += 1
+			if self.directory:
+				self.store(key, program)
+
+		self.remember(key, program)
+		return program
+
+	def remember(self, key, program):
+		with self.lock:
+			self.programs[key] = program
+			self.programs.move_to_end(key)
+			while len(self.programs) > self.maxsize:
+				self.programs.popitem(last=False)
+				self.stats.evictions += 1
+
+	def clear(self):
+		with self.lock:
+			self.programs.clear()
+
+	def __len__(self):
+		return len(self.programs)
+
+	###################################
+
+	def path(self, key):
+		return os.path.join(self.directory, key + SUFFIX)
+
+	def preload(self):
+		entries = []
+		for name in os.listdir(self.directory):
+			if name.endswith(SUFFIX):
+				path = os.path.join(self.directory, name)
+				try:
+					entries.append((os.path.getmtime(path), name[:-len(SUFFIX)]))
+				except OSError:
+					continue
+
+		# oldest first, so the newest files end up most recently used
+		for _, key in sorted(entries)[-self.maxsize:]:
+			program = self.load(key)
+			if program is not None:
+				self.remember(key, program)
+				self.stats.preloaded += 1
+
+	def load(self, key, source=None, fn=None):
+		# None for a missing file or one that fails validation
+		try:
+			with open(self.path(key), 'rb') as file:
+				data = file.read()
+		except OSError:
+			return None
+
+		try:
+			if not data.startswith(MAGIC):
+				raise ValueError('bad magic')
+			stored_key, data = marshal.loads(data[len(MAGIC):])
+			program = load_program(data)
+			if stored_key != key or cache_key(program.source, program.fn) != key:
+				raise ValueError('key mismatch')
+			if source is not None and (program.source != source or program.fn != fn):
+				raise ValueError('source mismatch')
+			return program
+		except Exception:
+			# truncated, corrupt or from another version: compile afresh
+			with self.lock: self.stats.invalid += 1
+			return None
+
+	def store(self, key, program):
+		data = MAGIC + marshal.dumps((key, program.to_bytes()))
+
+		# write then rename, so readers never see a partial file
+		path = self.path(key)
+		temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+		try:
+			with open(temp_path, 'wb') as file:
+				file.write(data)
+			os.replace(temp_path, path)
+		except OSError:
+			try: os.remove(temp_path)
+			except OSError: pass
+			return
+		with self.lock: self.stats.disk_writes += 1
@@ -0,0 +1,160 @@
+from .Parser import *
+from .errors import *
+from .rtresult import RTResult
+from .symbolTable import slot_for
+
+BINARY_METHODS = {
+	TT_PLUS: Number.added_to,
+	TT_MINUS: Number.subbed_by,
+	TT_MUL: Number.multed_by,
+	TT_DIV: Number.dived_by,
+	TT_EE: Number.get_comparison_eq,
+	TT_NE: Number.get_comparison_ne,
+	TT_LT: Number.get_comparison_lt,
+	TT_GT: Number.get_comparison_gt,
+	TT_LTE: Number.get_comparison_lte,
+	TT_GTE: Number.get_comparison_gte,
+	(TT_KEYWORD, 'aur'): Number.anded_by,
+	(TT_KEYWORD, 'ya'): Number.ored_by
+}
+
+#######################################
+# CLOSURE COMPILER
+#######################################
+
+# Every node becomes a function of the runtime context returning (value, error),
+# with its operator, children and constants bound once at compile time.
+
+class ClosureCompiler:
+	def compile(self, node):
+		return self.visit(node)
+
+	def visit(self, node):
+		method_name = f'visit_{type(node).__name__}'
+		method = getattr(self, method_name, self.no_visit_method)
+		return method(node)
+
+	def no_visit_method(self, node):
+		raise Exception(f'No visit_{type(node).__name__} method defined')
+
+	###################################
+
+	def visit_NumberNode(self, node):
+		value = node.value
+
+		def number(context):
+			return value, None
+		return number
+
+	def visit_VarAccessNode(self, node):
+		var_name = node.var_name_tok.value
+		slot = slot_for(var_name)
+		pos_start, pos_end = node.pos_start, node.pos_end
+
+		def var_access(context):
+			table = context.symbolTable
+			value = table.get_slot(slot) if slot is not None else table.get(var_name)
+			if not value:
+				return None, RTError(
+					pos_start, pos_end,
+					f"'{var_name}' is not defined",
+					context
+				)
+			return value, None
+		return var_access
+
+	def visit_VarAssignNode(self, node):
+		var_name = node.var_name_tok.value
+		slot = slot_for(var_name)
+		value_fn = self.visit(node.value_node)
+
+		def var_assign(context):
+			value, error = value_fn(context)
+			if error: return None, error
+			if slot is not None:
+				context.symbolTable.set_slot(slot, value)
+			else:
+				context.symbolTable.set(var_name, value)
+			return value, None
+		return var_assign
+
+	def visit_BinOpNode(self, node):
+		left_fn = self.visit(node.left_node)
+		right_fn = self.visit(node.right_node)
+		op_tok = node.op_tok
+		op = BINARY_METHODS[op_tok.type] if op_tok.type != TT_KEYWORD else BINARY_METHODS[(op_tok.type, op_tok.value)]
+		pos_start, pos_end = value_span(node.right_node)
+
+		def bin_op(context):
+			left, error = left_fn(context)
+			if error: return None, error
+			right, error = right_fn(context)
+			if error: return None, error
+			result, error = op(left, right)
+			if error: return None, error.set_pos(pos_start, pos_end).set_context(context)
+			return result, None
+		return bin_op
+
+	def visit_UnaryOpNode(self, node):
+		operand_fn = self.visit(node.node)
+
+		if node.op_tok.type == TT_MINUS:
+			def apply(number): return number.multed_by(Number(-1))
+		elif node.op_tok.matches(TT_KEYWORD, 'na'):
+			def apply(number): return number.notted()
+		else:
+			def apply(number): return number, None
+
+		def unary_op(context):
+			number, error = operand_fn(context)
+			if error: return None, error
+			return apply(number)
+		return unary_op
+
+	def visit_IfNode(self, node):
+		cases = tuple((self.visit(condition), self.visit(expr)) for condition, expr in node.cases)
+		else_fn = self.visit(node.else_case) if node.else_case else None
+
+		def if_expr(context):
+			for condition_fn, expr_fn in cases:
+				condition_value, error = condition_fn(context)
+				if error: return None, error
+				if condition_value.is_true():
+					return expr_fn(context)
+
+			if else_fn:
+				return else_fn(context)
+			return None, None
+		return if_expr
+
+	def visit_WhileNode(self, node):
+		condition_fn = self.visit(node.condition_node)
+		body_fn = self.visit(node.body_node)
+
+		def while_expr(context):
+			while True:
+				condition, error = condition_fn(context)
+				if error: return None, error
+				if not condition.is_true(): break
+
+				_, error = body_fn(context)
+				if error: return None, error
+			return None, None
+		return while_expr
+
+#######################################
+# CLOSURE INTERPRETER
+#######################################
+
+class ClosureInterpreter:
+	def visit(self, node, context):
+		return self.run(self.compile(node), context)
+
+	def compile(self, node):
+		return ClosureCompiler().compile(node)
+
+	def run(self, program, context):
+		res = RTResult()
+		value, error = program(context)
+		if error: return res.failure(error)
+		return res.success(value)
@@ -0,0 +1,207 @@
+from .Parser import *
+from .symbolTable import slot_for
+
+#######################################
+# OPCODES
+#######################################
+
+LOAD_CONST    = 0
+LOAD_NAME     = 1
+STORE_NAME    = 2
+POP_TOP       = 3
+JUMP          = 4
+JUMP_IF_FALSE = 5
+UNARY_NEG     = 6
+UNARY_NOT     = 7
+BINARY_ADD    = 8
+BINARY_SUB    = 9
+BINARY_MUL    = 10
+BINARY_DIV    = 11
+BINARY_EE     = 12
+BINARY_NE     = 13
+BINARY_LT     = 14
+BINARY_GT     = 15
+BINARY_LTE    = 16
+BINARY_GTE    = 17
+BINARY_AND    = 18
+BINARY_OR     = 19
+
+OPNAMES = [
+	'LOAD_CONST',
+	'LOAD_NAME',
+	'STORE_NAME',
+	'POP_TOP',
+	'JUMP',
+	'JUMP_IF_FALSE',
+	'UNARY_NEG',
+	'UNARY_NOT',
+	'BINARY_ADD',
+	'BINARY_SUB',
+	'BINARY_MUL',
+	'BINARY_DIV',
+	'BINARY_EE',
+	'BINARY_NE',
+	'BINARY_LT',
+	'BINARY_GT',
+	'BINARY_LTE',
+	'BINARY_GTE',
+	'BINARY_AND',
+	'BINARY_OR'
+]
+
+BINARY_OPS = {
+	TT_PLUS: BINARY_ADD,
+	TT_MINUS: BINARY_SUB,
+	TT_MUL: BINARY_MUL,
+	TT_DIV: BINARY_DIV,
+	TT_EE: BINARY_EE,
+	TT_NE: BINARY_NE,
+	TT_LT: BINARY_LT,
+	TT_GT: BINARY_GT,
+	TT_LTE: BINARY_LTE,
+	TT_GTE: BINARY_GTE,
+	(TT_KEYWORD, 'aur'): BINARY_AND,
+	(TT_KEYWORD, 'ya'): BINARY_OR
+}
+
+#######################################
+# CODE
+#######################################
+
+class Code:
+	def __init__(self, instructions, consts, names, positions):
+		# instructions is a tuple of (opcode, arg) pairs, jump targets index into it
+		self.instructions = instructions
+		self.consts = consts
+		self.names = names
+		self.slots = tuple(slot_for(name) for name in names)
+		# pc -> (pos_start, pos_end), only for instructions that can fail
+		self.positions = positions
+
+	def __getstate__(self):
+		# slot numbers are per process, names are what travels
+		state = self.__dict__.copy()
+		del state['slots']
+		return state
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self.slots = tuple(slot_for(name) for name in self.names)
+
+	def disassemble(self):
+		lines = []
+		for pc, (op, arg) in enumerate(self.instructions):
+			if op == LOAD_CONST:
+				detail = f'({self.consts[arg]!r})'
+			elif op in (LOAD_NAME, STORE_NAME):
+				detail = f'({self.names[arg]})'
+			else:
+				detail = ''
+			lines.append(f'{pc:>4} {OPNAMES[op]:<14} {arg} {detail}'.rstrip())
+		return '\n'.join(lines)
+
+	def __repr__(self):
+		return f'<Code {len(self.instructions)} instructions>'
+
+#######################################
+# COMPILER
+#######################################
+
+class Compiler:
+	def compile(self, node):
+		self.instructions = []
+		self.consts = []
+		self.const_idx = {}
+		self.names = []
+		self.name_idx = {}
+		self.positions = {}
+
+		self.visit(node)
+		return Code(tuple(self.instructions), tuple(self.consts), tuple(self.names), self.positions)
+
+	def emit(self, op, arg=0, span=None):
+		if span: self.positions[len(self.instructions)] = span
+		self.instructions.append((op, arg))
+		return len(self.instructions) - 1
+
+	def patch(self, pc, target):
+		self.instructions[pc] = (self.instructions[pc][0], target)
+
+	def const(self, value):
+		# keyed on type so 1, 1.0 and None never share a slot
+		key = (type(value), value)
+		if key not in self.const_idx:
+			self.const_idx[key] = len(self.consts)
+			self.consts.append(value)
+		return self.const_idx[key]
+
+	def name(self, name):
+		if name not in self.name_idx:
+			self.name_idx[name] = len(self.names)
+			self.names.append(name)
+		return self.name_idx[name]
+
+	def visit(self, node):
+		method_name = f'visit_{type(node).__name__}'
+		method = getattr(self, method_name, self.no_visit_method)
+		return method(node)
+
+	def no_visit_method(self, node):
+		raise Exception(f'No visit_{type(node).__name__} method defined')
+
+	###################################
+
+	def visit_NumberNode(self, node):
+		self.emit(LOAD_CONST, self.const(node.tok.value))
+
+	def visit_VarAccessNode(self, node):
+		self.emit(LOAD_NAME, self.name(node.var_name_tok.value), (node.pos_start, node.pos_end))
+
+	def visit_VarAssignNode(self, node):
+		self.visit(node.value_node)
+		self.emit(STORE_NAME, self.name(node.var_name_tok.value))
+
+	def visit_BinOpNode(self, node):
+		self.visit(node.left_node)
+		self.visit(node.right_node)
+
+		op_tok = node.op_tok
+		op = BINARY_OPS.get(op_tok.type) if op_tok.type != TT_KEYWORD else BINARY_OPS.get((op_tok.type, op_tok.value))
+		span = value_span(node.right_node) if op == BINARY_DIV else None
+		self.emit(op, 0, span)
+
+	def visit_UnaryOpNode(self, node):
+		self.visit(node.node)
+
+		if node.op_tok.type == TT_MINUS:
+			self.emit(UNARY_NEG)
+		elif node.op_tok.matches(TT_KEYWORD, 'na'):
+			self.emit(UNARY_NOT)
+
+	def visit_IfNode(self, node):
+		exit_jumps = []
+
+		for condition, expr in node.cases:
+			self.visit(condition)
+			next_case = self.emit(JUMP_IF_FALSE)
+			self.visit(expr)
+			exit_jumps.append(self.emit(JUMP))
+			self.patch(next_case, len(self.instructions))
+
+		if node.else_case:
+			self.visit(node.else_case)
+		else:
+			self.emit(LOAD_CONST, self.const(None))
+
+		for jump in exit_jumps:
+			self.patch(jump, len(self.instructions))
+
+	def visit_WhileNode(self, node):
+		loop_start = len(self.instructions)
+		self.visit(node.condition_node)
+		exit_jump = self.emit(JUMP_IF_FALSE)
+		self.visit(node.body_node)
+		self.emit(POP_TOP)
+		self.emit(JUMP, loop_start)
+		self.patch(exit_jump, len(self.instructions))
+		self.emit(LOAD_CONST, self.const(None))
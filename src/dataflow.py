@@ -0,0 +1,147 @@
+import heapq
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .Parser import *
+from .interpreter import Interpreter
+from .symbolTable import NAMES, slot_for
+
+#######################################
+# ANALYSIS
+#######################################
+
+def read_write_sets(node):
+	# every name the statement may read or assign, whichever branches and
+	# however many loop iterations actually run
+	reads = set()
+	writes = set()
+	stack = [node]
+	while stack:
+		node = stack.pop()
+		if isinstance(node, VarAccessNode):
+			reads.add(node.var_name_tok.value)
+		elif isinstance(node, VarAssignNode):
+			writes.add(node.var_name_tok.value)
+		stack.extend(children(node))
+	return reads, writes
+
+def dependencies(statements):
+	# deps[j]: earlier statements j has to wait for. Every pair where one
+	# writes a name the other reads or writes is ordered, though not always
+	# directly: j waits for the last writer of each name it touches and,
+	# for names it writes, for the readers since then. Statements with no
+	# path between them touch disjoint names and can run in any order.
+	deps = []
+	writes = []
+	last_writer = {}
+	readers = {}    # name -> statements reading it since its last writer
+	for j, node in enumerate(statements):
+		reads_j, writes_j = read_write_sets(node)
+		earlier = set()
+		for name in reads_j | writes_j:
+			if name in last_writer:
+				earlier.add(last_writer[name])
+		for name in writes_j:
+			earlier.update(readers.pop(name, ()))
+			last_writer[name] = j
+		for name in reads_j - writes_j:
+			readers.setdefault(name, []).append(j)
+		earlier.discard(j)
+		deps.append(earlier)
+		writes.append(writes_j)
+	return deps, writes
+
+#######################################
+# DATAFLOW SCHEDULER
+#######################################
+
+# Runs the top-level statements of a program on a thread pool, each one as
+# soon as the statements it depends on have finished, all against the one
+# symbol table. The result is the same as running them in order: the same
+# final table, and the same first error, after which nothing else counts.
+#
+# A statement after the first error may already have run by the time the
+# error is known; the names it wrote are put back, latest statement first,
+# from the values they held when it started. Such a statement does run to
+# the end, so a later loop that never terminates can hang a program that
+# sequential execution would have stopped at the error; ready statements
+# are started lowest index first to keep that window small.
+#
+# Statements only overlap when they touch disjoint names, so the backend's
+# visit() just needs a separate instance per thread. Under the GIL this
+# gives no speedup for pure-Python evaluation; it pays off on a
+# free-threaded build, or when statements wait on something else.
+
+class DataflowScheduler:
+	def __init__(self, workers=None, backend=Interpreter):
+		self.workers = workers or os.cpu_count() or 1
+		self.backend = backend
+		self.local = threading.local()
+
+	def run(self, statements, context):
+		# One RTResult per statement sequential execution would have run:
+		# all of them, or up to and including the first that failed.
+		deps, writes = dependencies(statements)
+		dependents = [[] for _ in statements]
+		waiting = []
+		for j, earlier in enumerate(deps):
+			for i in earlier:
+				dependents[i].append(j)
+			waiting.append(len(earlier))
+
+		table = context.symbolTable
+		for names in writes:
+			for name in names: slot_for(name)
+		# no resizing of the values list once threads are writing to it
+		table.reserve(len(NAMES))
+
+		results = [None] * len(statements)
+		saved = {}                  # statement -> values of its writes before it ran
+		first_error = len(statements)
+		ready = [j for j, count in enumerate(waiting) if count == 0]
+		heapq.heapify(ready)
+		running = {}
+
+		with ThreadPoolExecutor(self.workers) as pool:
+			while ready or running:
+				while ready and len(running) < self.workers:
+					j = heapq.heappop(ready)
+					if j > first_error: continue
+					saved[j] = [(name, local_value(table, name)) for name in writes[j]]
+					running[pool.submit(self.evaluate, statements[j], context)] = j
+				if not running: break
+
+				done, _ = wait(running, return_when=FIRST_COMPLETED)
+				for future in done:
+					j = running.pop(future)
+					# an exception out of the backend counts like an error
+					# here and is raised once it is known to be the first
+					res = results[j] = future.exception() or future.result()
+					if isinstance(res, BaseException) or res.error:
+						first_error = min(first_error, j)
+						continue
+					for k in dependents[j]:
+						waiting[k] -= 1
+						if waiting[k] == 0:
+							heapq.heappush(ready, k)
+
+		for j in sorted(saved, reverse=True):
+			if j <= first_error: break
+			for name, value in saved[j]:
+				table.set(name, value)
+		if first_error < len(statements) and isinstance(results[first_error], BaseException):
+			raise results[first_error]
+		return results[:first_error + 1]
+
+	def evaluate(self, node, context):
+		interpreter = getattr(self.local, 'interpreter', None)
+		if interpreter is None:
+			interpreter = self.local.interpreter = self.backend()
+		return interpreter.visit(node, context)
+
+def local_value(table, name):
+	# the table's own value for name, without looking in its parents
+	slot = slot_for(name)
+	if slot is None:
+		return table.overflow.get(name)
+	return table.values[slot]
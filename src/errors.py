@@ -7,9 +7,30 @@ class Error:
         self.pos = pos
         self.pos2 = pos2
     
+    def set_pos(self, pos, pos2):
+        self.pos = pos
+        self.pos2 = pos2
+        return self
+
     def asStr(self):
-        return f'{self.name}: {self.details}, position {self.pos}{self.pos2}'
+        if self.pos is None:
+            return f'{self.name}: {self.details}'
+        return (f'{self.name}: {self.details}\n'
+                f'File {self.pos.fn}, line {self.pos.ln + 1}, column {self.pos.col + 1}\n\n'
+                + string_with_arrows(self.pos.ftxt, self.pos, self.pos2))
     
+class ErrorSignal(Exception):
+    # Raised inside the parser and interpreter to unwind straight to the
+    # public entry point, which hands .error back in a ParseResult/RTResult.
+    def __init__(self, error):
+        super().__init__(error.details)
+        self.error = error
+
+class CompileError(ErrorSignal):
+    # Raised by compile() when the source does not lex or parse.
+    def __str__(self):
+        return self.error.asStr()
+
 class IllegalCharError(Error):
     def __init__(self,details,pos, pos2):
         super().__init__("IllegalCharError", details,  pos, pos2)
@@ -27,18 +48,24 @@ class RTError(Error):
 		super().__init__('Runtime Error', details, pos_start, pos_end)
 		self.context = context
 
+	def set_context(self, context):
+		self.context = context
+		return self
+
 	def as_string(self):
+		# asStr() with the chain of contexts the error was raised in
 		result  = self.generate_traceback()
-		result += f'{self.error_name}: {self.details}'
-		result += '\n\n' + string_with_arrows(self.pos_start.ftxt, self.pos_start, self.pos_end)
+		result += f'{self.name}: {self.details}'
+		if self.pos is not None:
+			result += '\n\n' + string_with_arrows(self.pos.ftxt, self.pos, self.pos2)
 		return result
 
 	def generate_traceback(self):
 		result = ''
-		pos = self.pos_start
+		pos = self.pos
 		ctx = self.context
 
-		while ctx:
+		while ctx and pos:
 			result = f'  File {pos.fn}, line {str(pos.ln + 1)}, in {ctx.display_name}\n' + result
 			pos = ctx.parent_entry_pos
 			ctx = ctx.parent
@@ -0,0 +1,164 @@
+import random
+
+# Names the generated expressions read; each program assigns them first.
+# Assignments only ever target SCRATCH, which is never read, so values
+# stay bounded however many loop iterations run.
+VARIABLES = ('a', 'b', 'c')
+SCRATCH = 't'
+PRELUDE = ('yehai a = 3', 'yehai b = 7', 'yehai c = 2', 'yehai t = 0')
+
+OPERATORS = ('+', '-', '*', '/', '==', '!=', '<', '>', '<=', '>=', 'aur', 'ya')
+
+def loop_nest(levels, iterations, body):
+	# levels jabtak loops, one inside the other, each running iterations
+	# times per run of the one around it. Each condition counts its own
+	# loop and resets the next one's counter, so bodies are free to be
+	# anything; counters are i0, i1, ... and i0 has to be 0 beforehand.
+	source = body
+	for level in reversed(range(levels)):
+		step = f'(yehai i{level} = i{level} + 1)'
+		if level + 1 < levels:
+			step += f' + (yehai i{level + 1} = 0)'
+		source = f'jabtak {step} <= {iterations} phir {source}'
+	return source
+
+#######################################
+# PROGRAM GENERATOR
+#######################################
+
+# Random programs from the grammar, valid by construction: every one
+# parses, and evaluates without an error and in bounded time. Divisors are
+# nonzero literals, every agar in a value position has a nahito, and loops
+# only appear as whole statements, since their value is None. size is
+# about how many AST nodes to generate (loops multiply how many are
+# evaluated); depth bounds nesting within an expression and chain the
+# length of an operator chain, so a big program is a long one rather than
+# a deep one. SHAPES below holds the deliberately deep or long families.
+
+class ProgramGenerator:
+	def __init__(self, seed=None, depth=6, chain=8, loop_depth=2, iterations=3):
+		self.random = random.Random(seed)
+		self.depth = depth
+		self.chain = chain
+		self.loop_depth = loop_depth
+		self.iterations = iterations
+		self.names = VARIABLES
+
+	def program(self, size, statements=None):
+		# newline-separated statements of about size nodes in all, as run
+		# by `swing.py run` or compile()
+		if statements is None:
+			statements = max(1, size // 40)
+		lines = list(PRELUDE)
+		for _ in range(statements):
+			lines.extend(self.statement(max(1, size // statements)))
+		return '\n'.join(lines)
+
+	def statement(self, size):
+		rnd = self.random
+		if self.loop_depth and rnd.random() < 0.3:
+			levels = rnd.randint(1, self.loop_depth)
+			self.names = VARIABLES + tuple(f'i{level}' for level in range(levels))
+			try:
+				body = self.expression(size)
+			finally:
+				self.names = VARIABLES
+			return ['yehai i0 = 0', loop_nest(levels, self.iterations, body)]
+		if rnd.random() < 0.2:
+			return [f'yehai {SCRATCH} = {self.expression(size - 1)}']
+		return [self.expression(size)]
+
+	###################################
+
+	def expression(self, size, depth=0):
+		rnd = self.random
+		if size <= 1 or depth >= self.depth:
+			return self.atom()
+		terms = rnd.randint(1, min(self.chain, size // 2 or 1))
+		if terms == 1:
+			return self.operand(size, depth)
+
+		share = max(1, (size - terms + 1) // terms)
+		parts = [self.operand(share, depth)]
+		for _ in range(terms - 1):
+			op = rnd.choice(OPERATORS)
+			parts.append(op)
+			parts.append(self.divisor() if op == '/' else self.operand(share, depth))
+		return ' '.join(parts)
+
+	def operand(self, size, depth):
+		# something bin_expr() takes as a whole operand, at any precedence
+		rnd = self.random
+		if size <= 1 or depth >= self.depth:
+			return self.atom()
+		depth += 1
+		choice = rnd.random()
+		if choice < 0.35:
+			return f'({self.expression(size, depth)})'
+		if choice < 0.5:
+			return f'-{self.operand(size - 1, depth)}'
+		if choice < 0.6:
+			return f'(na {self.operand(size - 1, depth)})'
+		if choice < 0.7:
+			return f'(yehai {SCRATCH} = {self.expression(size - 1, depth)})'
+		return self.if_expr(size, depth)
+
+	def if_expr(self, size, depth):
+		rnd = self.random
+		cases = rnd.randint(1, 3)
+		share = max(1, (size - 1) // (2 * cases + 1))
+		parts = ['(agar']
+		for case in range(cases):
+			if case: parts.append('nahito_agar')
+			parts += [self.expression(share, depth), 'phir', self.expression(share, depth)]
+		parts += ['nahito', self.expression(share, depth)]
+		return ' '.join(parts) + ')'
+
+	def atom(self):
+		rnd = self.random
+		choice = rnd.random()
+		if choice < 0.5:
+			return rnd.choice(self.names)
+		if choice < 0.85:
+			return str(rnd.randint(0, 9))
+		return rnd.choice(('0.5', '1.5', '2.25'))
+
+	def divisor(self):
+		return self.random.choice(('2', '3', '7', '0.5', '1.5'))
+
+#######################################
+# SHAPES
+#######################################
+
+# Families where one knob, n, makes a single expression longer or deeper:
+# the inputs most likely to cost more than linear time or to run out of
+# Python stack in a recursive parser or evaluator.
+
+def sum_chain(n):
+	return ' + '.join(str(i % 10) for i in range(n))
+
+def nested_parens(n):
+	return '(1 + ' * n + '1' + ')' * n
+
+def negation_chain(n):
+	return '-' * n + '1'
+
+def assignment_chain(n):
+	return f'yehai {SCRATCH} = ' * n + '1'
+
+def elif_ladder(n):
+	# every condition is evaluated before the nahito is reached
+	cases = ' nahito_agar '.join(f'a == {i} phir {i}' for i in range(n))
+	return f'yehai a = {n}\nagar {cases} nahito a'
+
+def nested_jabtak(n):
+	return 'yehai i0 = 0\n' + loop_nest(n, 1, f'yehai {SCRATCH} = i0')
+
+SHAPES = {
+	'sum chain': sum_chain,
+	'nested parens': nested_parens,
+	'negation chain': negation_chain,
+	'assignment chain': assignment_chain,
+	'elif ladder': elif_ladder,
+	'nested jabtak': nested_jabtak,
+}
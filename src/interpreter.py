@@ -1,6 +1,8 @@
+import weakref
 from .Parser import *
 from .errors import *
 from .rtresult import RTResult
+from .specializer import HOT_LOOP_THRESHOLD, LoopSpecializer, NotSpecializable, TierStats
 from .Parser import *
 
 LETTERS = string.ascii_letters
@@ -38,9 +40,32 @@ KEYWORDS = [
 ]
 
 class Interpreter:
+	# visit() is the public entry point and returns an RTResult. Below it
+	# every visit_* method returns the bare value and a runtime error is
+	# raised as ErrorSignal, so the success path allocates no wrappers.
+	def __init__(self, hot_loop_threshold=HOT_LOOP_THRESHOLD):
+		self.methods = {}
+		# jabtak loops tier up to a specialized function once they have run
+		# this many iterations in total (None keeps everything generic)
+		self.hot_loop_threshold = hot_loop_threshold
+		# keyed weakly by WhileNode, so a long-lived interpreter (the stream
+		# REPL, a server worker) forgets loops once their AST is dropped
+		self.loop_counts = weakref.WeakKeyDictionary()
+		self.specialized = weakref.WeakKeyDictionary()
+		self.tier_stats = TierStats()
+
 	def visit(self, node, context):
-		method_name = f'visit_{type(node).__name__}'
-		method = getattr(self, method_name, self.no_visit_method)
+		res = RTResult()
+		try:
+			return res.success(self.evaluate(node, context))
+		except ErrorSignal as signal:
+			return res.failure(signal.error)
+
+	def evaluate(self, node, context):
+		method = self.methods.get(type(node))
+		if method is None:
+			method_name = f'visit_{type(node).__name__}'
+			method = self.methods[type(node)] = getattr(self, method_name, self.no_visit_method)
 		return method(node, context)
 
 	def no_visit_method(self, node, context):
@@ -49,40 +74,42 @@ class Interpreter:
 	###################################
 
 	def visit_NumberNode(self, node, context):
-		return RTResult().success(
-			Number(node.tok.value).set_context(context).set_pos(node.pos_start, node.pos_end)
-		)
+		return node.value
 
 	def visit_VarAccessNode(self, node, context):
-		res = RTResult()
 		var_name = node.var_name_tok.value
-		value = context.symbolTable.get(var_name)
+		table = context.symbolTable
+		slot = node.slot
+		values = table.values
+		value = values[slot] if slot is not None and slot < len(values) else None
+		if value is None:
+			# unresolved node, table not sized yet, or defined in a parent
+			value = table.get(var_name)
 
 		if not value:
-			return res.failure(RTError(
+			raise ErrorSignal(RTError(
 				node.pos_start, node.pos_end,
 				f"'{var_name}' is not defined",
 				context
 			))
 
-		value = value.copy().set_pos(node.pos_start, node.pos_end)
-		return res.success(value)
+		return value
 
 	def visit_VarAssignNode(self, node, context):
-		res = RTResult()
 		var_name = node.var_name_tok.value
-		value = res.register(self.visit(node.value_node, context))
-		if res.error: return res
+		value = self.evaluate(node.value_node, context)
 
-		context.symbolTable.set(var_name, value)
-		return res.success(value)
+		slot = node.slot
+		values = context.symbolTable.values
+		if slot is not None and slot < len(values):
+			values[slot] = value
+		else:
+			context.symbolTable.set(var_name, value)
+		return value
 
 	def visit_BinOpNode(self, node, context):
-		res = RTResult()
-		left = res.register(self.visit(node.left_node, context))
-		if res.error: return res
-		right = res.register(self.visit(node.right_node, context))
-		if res.error: return res
+		left = self.evaluate(node.left_node, context)
+		right = self.evaluate(node.right_node, context)
 
 		if node.op_tok.type == TT_PLUS:
 			result, error = left.added_to(right)
@@ -110,57 +137,70 @@ class Interpreter:
 			result, error = left.ored_by(right)
 
 		if error:
-			return res.failure(error)
-		else:
-			return res.success(result.set_pos(node.pos_start, node.pos_end))
+			pos_start, pos_end = value_span(node.right_node)
+			raise ErrorSignal(error.set_pos(pos_start, pos_end).set_context(context))
+		return result
 
 	def visit_IfNode(self, node, context):
-		res = RTResult()
-
 		for condition, expr in node.cases:
-			condition_value = res.register(self.visit(condition, context))
-			if res.error: return res
-
+			condition_value = self.evaluate(condition, context)
 			if condition_value.is_true():
-				expr_value = res.register(self.visit(expr, context))
-				if res.error: return res
-				return res.success(expr_value)
-
+				return self.evaluate(expr, context)
 
 		if node.else_case:
-			else_value = res.register(self.visit(node.else_case, context))
-			if res.error: return res
-			return res.success(else_value)
+			return self.evaluate(node.else_case, context)
 
-		return res.success(None)
+		return None
 
 	def visit_WhileNode(self, node, context):
-		res = RTResult()
+		evaluate = self.evaluate
+		condition_node = node.condition_node
+		body_node = node.body_node
+		threshold = self.hot_loop_threshold
+		count = self.loop_counts.get(node, 0) if threshold is not None else None
 
 		while True:
-			condition = res.register(self.visit(node.condition_node, context))
-			if res.error: return res
-
-			if not condition.is_true(): break
-
-			res.register(self.visit(node.body_node, context))
-			if res.error: return res
-
-		return res.success(None)
+			if count is not None:
+				count += 1
+				if count > threshold:
+					self.loop_counts[node] = count
+					if self.tier_up(node, context): return None
+					# bailed out: finish this run generically
+					count = None
+
+			if not evaluate(condition_node, context).is_true(): break
+			evaluate(body_node, context)
+
+		if count is not None:
+			self.loop_counts[node] = count
+		return None
+
+	def tier_up(self, node, context):
+		if node in self.specialized:
+			loop = self.specialized[node]
+		else:
+			try:
+				loop = LoopSpecializer().specialize(node)
+				self.tier_stats.compiled += 1
+			except (NotSpecializable, SyntaxError, RecursionError):
+				# SyntaxError: nesting too deep for Python's own parser
+				loop = None
+				self.tier_stats.rejected += 1
+			self.specialized[node] = loop
+
+		if loop is None:
+			return False
+		return loop.run(context, self.tier_stats)
 
 	def visit_UnaryOpNode(self, node, context):
-		res = RTResult()
-		number = res.register(self.visit(node.node, context))
-		if res.error: return res
-
+		number = self.evaluate(node.node, context)
 		error = None
 
 		if node.op_tok.type == TT_MINUS:
 			number, error = number.multed_by(Number(-1))
-		elif node.op_tok.matches(TT_KEYWORD, 'NOT'):
+		elif node.op_tok.matches(TT_KEYWORD, 'na'):
 			number, error = number.notted()
 
 		if error:
-			return res.failure(error)
-		else:
-			return res.success(number.set_pos(node.pos_start, node.pos_end))
\ No newline at end of file
+			raise ErrorSignal(error)
+		return number
@@ -0,0 +1,218 @@
+from .Parser import *
+from .errors import *
+from .interpreter import Interpreter
+from .closures import BINARY_METHODS
+
+# Number method behind each binary operator, looked up on the left operand
+# as visit_BinOpNode does
+METHOD_NAMES = {op: method.__name__ for op, method in BINARY_METHODS.items()}
+
+# Continuation frames go on the work stack as a marker on top of their
+# node, with the frame's state under the node where it has one, so nothing
+# is allocated for them. When a frame is reached:
+BINARY      = 0     # both operands are on the value stack
+BINARY_LEAF = 1     # the left operand is; the right is a number or variable
+UNARY       = 2     # the operand is on the value stack
+ASSIGN      = 3     # the value is on the value stack
+IF_CASE     = 4     # state: index of the case whose condition is on the value stack
+WHILE_TEST  = 5     # the condition is on the value stack; state: iteration count
+WHILE_NEXT  = 6     # the body's value is on the value stack; state as above
+
+#######################################
+# ITERATIVE INTERPRETER
+#######################################
+
+# The tree-walking interpreter without the recursion: evaluate() walks the
+# tree with an explicit work stack of nodes still to evaluate and
+# continuation frames, and a value stack of the results waiting for their
+# parent. Operands are evaluated in post-order, left first; an agar keeps
+# a frame per condition tested and a jabtak one per iteration, so the
+# Python stack stays flat however deep the tree is, and a chain of 100k
+# terms runs like a short one. Values, errors (positions and context
+# included), symbol table updates and loop tier-up are Interpreter's.
+
+class IterativeInterpreter(Interpreter):
+	def evaluate(self, node, context):
+		todo = [node]
+		values = []
+		push = todo.append
+		pop = todo.pop
+		push_value = values.append
+		pop_value = values.pop
+		table_values = context.symbolTable.values
+		size = len(table_values)
+
+		while todo:
+			item = pop()
+			kind = type(item)
+
+			if kind is int:
+				node = pop()
+
+				if item <= BINARY_LEAF:
+					if item == BINARY_LEAF:
+						right_node = node.right_node
+						if type(right_node) is NumberNode:
+							right = right_node.value
+						else:
+							slot = right_node.slot
+							right = table_values[slot] if slot is not None and slot < size else None
+							if right is None:
+								right = self.visit_VarAccessNode(right_node, context)
+					else:
+						right = pop_value()
+					left = pop_value()
+					op_tok = node.op_tok
+					name = METHOD_NAMES[op_tok.type] if op_tok.type != TT_KEYWORD else METHOD_NAMES[(op_tok.type, op_tok.value)]
+					result, error = getattr(left, name)(right)
+					if error:
+						pos_start, pos_end = value_span(node.right_node)
+						raise ErrorSignal(error.set_pos(pos_start, pos_end).set_context(context))
+					push_value(result)
+
+				elif item == WHILE_NEXT:
+					# the body's value (or None on entry) is dropped; start
+					# the next iteration as visit_WhileNode does
+					pop_value()
+					count = pop()
+					if count is not None:
+						count += 1
+						if count > self.hot_loop_threshold:
+							self.loop_counts[node] = count
+							if self.tier_up(node, context):
+								push_value(None)
+								continue
+							count = None
+					push(count)
+					push(node)
+					push(WHILE_TEST)
+					push(node.condition_node)
+
+				elif item == WHILE_TEST:
+					count = pop()
+					if pop_value().is_true():
+						push(count)
+						push(node)
+						push(WHILE_NEXT)
+						push(node.body_node)
+					else:
+						if count is not None:
+							self.loop_counts[node] = count
+						push_value(None)
+
+				elif item == IF_CASE:
+					index = pop()
+					if pop_value().is_true():
+						push(node.cases[index][1])
+					elif index + 1 < len(node.cases):
+						push(index + 1)
+						push(node)
+						push(IF_CASE)
+						push(node.cases[index + 1][0])
+					elif node.else_case:
+						push(node.else_case)
+					else:
+						push_value(None)
+
+				elif item == ASSIGN:
+					value = values[-1]
+					slot = node.slot
+					if slot is not None and slot < size:
+						table_values[slot] = value
+					else:
+						context.symbolTable.set(node.var_name_tok.value, value)
+						size = len(table_values)
+
+				else:
+					# UNARY
+					number = pop_value()
+					error = None
+					if node.op_tok.type == TT_MINUS:
+						number, error = number.multed_by(Number(-1))
+					elif node.op_tok.matches(TT_KEYWORD, 'na'):
+						number, error = number.notted()
+					if error:
+						raise ErrorSignal(error)
+					push_value(number)
+
+			elif kind is BinOpNode:
+				# a number or resolved variable as the left operand is read
+				# right away, and so is the right one when the left was; a
+				# number or variable on the right of anything else is read
+				# by the frame, after the left operand
+				left_node = item.left_node
+				left_kind = type(left_node)
+				if left_kind is NumberNode:
+					left = left_node.value
+				elif left_kind is VarAccessNode and left_node.slot is not None and left_node.slot < size:
+					left = table_values[left_node.slot]
+				else:
+					left = None
+				right_node = item.right_node
+				right_kind = type(right_node)
+				if left is None:
+					push(item)
+					if right_kind is NumberNode or right_kind is VarAccessNode:
+						push(BINARY_LEAF)
+					else:
+						push(BINARY)
+						push(right_node)
+					push(left_node)
+					continue
+
+				if right_kind is NumberNode:
+					right = right_node.value
+				elif right_kind is VarAccessNode and right_node.slot is not None and right_node.slot < size:
+					right = table_values[right_node.slot]
+				else:
+					right = None
+				if right is None:
+					push_value(left)
+					push(item)
+					push(BINARY)
+					push(right_node)
+					continue
+
+				op_tok = item.op_tok
+				name = METHOD_NAMES[op_tok.type] if op_tok.type != TT_KEYWORD else METHOD_NAMES[(op_tok.type, op_tok.value)]
+				result, error = getattr(left, name)(right)
+				if error:
+					pos_start, pos_end = value_span(right_node)
+					raise ErrorSignal(error.set_pos(pos_start, pos_end).set_context(context))
+				push_value(result)
+
+			elif kind is NumberNode:
+				push_value(item.value)
+
+			elif kind is VarAccessNode:
+				slot = item.slot
+				value = table_values[slot] if slot is not None and slot < size else None
+				push_value(value if value is not None else self.visit_VarAccessNode(item, context))
+
+			elif kind is VarAssignNode:
+				push(item)
+				push(ASSIGN)
+				push(item.value_node)
+
+			elif kind is UnaryOpNode:
+				push(item)
+				push(UNARY)
+				push(item.node)
+
+			elif kind is IfNode:
+				push(0)
+				push(item)
+				push(IF_CASE)
+				push(item.cases[0][0])
+
+			elif kind is WhileNode:
+				push_value(None)
+				push(self.loop_counts.get(item, 0) if self.hot_loop_threshold is not None else None)
+				push(item)
+				push(WHILE_NEXT)
+
+			else:
+				# a node type this loop does not know, e.g. from a subclass
+				push_value(super().evaluate(item, context))
+
+		return values[-1]
@@ -1,8 +1,8 @@
 
+import re
 import string
 from .errors import *
 from .tokens import Token
-from .Parser import Parser
 from .position import Position
 
 LETTERS = string.ascii_letters
@@ -25,6 +25,7 @@ TT_GTE      = 'GTE'
 TT_LTE      = 'LTE'
 TT_LPAREN   = 'LPAREN'
 TT_RPAREN   = 'RPAREN'
+TT_NEWLINE  = 'NEWLINE'
 TT_EOF      = 'EOF'
 
 KEYWORDS = [
@@ -39,133 +40,88 @@ KEYWORDS = [
     'jabtak'
 ]
 
+KEYWORD_SET = frozenset(KEYWORDS)
+
+OPERATORS = {
+    '+': TT_PLUS,
+    '-': TT_MINUS,
+    '*': TT_MUL,
+    '/': TT_DIV,
+    '(': TT_LPAREN,
+    ')': TT_RPAREN,
+    '=': TT_EQ,
+    '==': TT_EE,
+    '!=': TT_NE,
+    '<': TT_LT,
+    '<=': TT_LTE,
+    '>': TT_GT,
+    '>=': TT_GTE,
+}
+
+# One alternation per token class, tried at the current offset. Group order
+# matters: two-character operators before their one-character prefixes, and
+# a lone '!' is its own group so it can be reported as ExpectedCharError.
+TOKEN_RE = re.compile(r'''
+     (?P<SKIP>[ \t\r]+)
+    |(?P<NEWLINE>\n)
+    |(?P<NUMBER>[0-9]+(?:\.[0-9]*)?)
+    |(?P<NAME>[A-Za-z][A-Za-z0-9_]*)
+    |(?P<OP>==|!=|<=|>=|[-+*/()=<>])
+    |(?P<BANG>!)
+''', re.VERBOSE)
+
 class Lexer:
     def __init__(self, text, fn):
         self.text = text
-        self.pos = Position(-1, 1, 1, fn, text)
-        self.currentChar = None
-        self.textIdx = -1
-        
-    def advance(self):
-        self.pos.advance()
-        self.currentChar = self.text[self.pos.idx] if self.pos.idx < len(self.text) else None
-    
+        self.fn = fn
+        self.error = None
+
     def getTokens(self):
-        self.advance()
-        tokens = []
-        while self.currentChar != None:
-            if self.currentChar in ' /t':
-                self.advance()
-            elif self.currentChar in DIGITS:
-                tokens.append(self.mkNum())
-            elif self.currentChar == '+':
-                tokens.append(Token(TT_PLUS, pos_start=self.pos))
-                self.advance()
-            elif self.currentChar in LETTERS:
-                tokens.append(self.mkIdentifier())
-                self.advance()
-            elif self.currentChar == '-':
-                tokens.append(Token(TT_MINUS, pos_start=self.pos))
-                self.advance()
-            elif self.currentChar == '/':
-                tokens.append(Token(TT_DIV, pos_start=self.pos))
-                self.advance()
-            elif self.currentChar == '*':
-                tokens.append(Token(TT_MUL, pos_start=self.pos))
-                self.advance()
-            elif self.currentChar == '=':
-                tokens.append(self.mkEquals())
-                self.advance()
-            elif self.currentChar == '!':
-                tok, error = self.mkNotEquals()
-                if error: return [], error
-                tokens.append(tok)
-            elif self.currentChar == '>':
-                tokens.append(self.mkGreaterThan())
-                self.advance()
-            elif self.currentChar == '<':
-                tokens.append(self.mkLessThan())
-                self.advance()
-            elif self.currentChar == '(':
-                tokens.append(Token(TT_LPAREN, pos_start=self.pos))
-                self.advance()
-            elif self.currentChar == ')':
-                tokens.append(Token(TT_RPAREN, pos_start=self.pos))
-                self.advance()
-            else: return tokens, IllegalCharError('not a tok', 6,8) 
-            
-        tokens.append(Token(TT_EOF, pos_start=self.pos))
+        tokens = list(self.iterTokens())
+        if self.error:
+            return tokens[:-1], self.error
         return tokens, None
-    
-    def mkNum(self):
-        num_str = ''
-        dotCount = 0
 
-        while self.currentChar != None and self.currentChar in DIGITS + '.':
-            if self.currentChar == '.':
-                if dotCount == 1: break
-                dotCount += 1
-                num_str += '.'
-            else:
-                num_str += self.currentChar
-            self.advance()
+    def iterTokens(self):
+        # Yields tokens as they are matched. On a bad character it records
+        # self.error and yields a closing EOF there, so a parser reading the
+        # stream always terminates; callers must check self.error after.
+        text = self.text
+        fn = self.fn
+        mkToken = Token.at
+        idx = 0
+
+        for m in TOKEN_RE.finditer(text):
+            tokStart, tokEnd = m.span()
+            if tokStart != idx:
+                # finditer skipped something no token class accepts
+                self.error = IllegalCharError('not a tok', Position(idx, fn, text), Position(idx + 1, fn, text))
+                break
+            idx = tokEnd
 
-        if dotCount == 0:
-            return Token(TT_INT, int(num_str))
+            kind = m.lastgroup
+            if kind == 'SKIP':
+                continue
+            elif kind == 'NAME':
+                word = m.group()
+                yield mkToken(TT_KEYWORD if word in KEYWORD_SET else TT_IDENTIFIER, word, tokStart, tokEnd, fn, text)
+            elif kind == 'OP':
+                yield mkToken(OPERATORS[m.group()], None, tokStart, tokEnd, fn, text)
+            elif kind == 'NEWLINE':
+                # zero width, so an error here points at the end of its line
+                yield mkToken(TT_NEWLINE, None, tokStart, tokStart, fn, text)
+            elif kind == 'NUMBER':
+                numStr = m.group()
+                if '.' in numStr:
+                    yield mkToken(TT_FLOAT, float(numStr), tokStart, tokEnd, fn, text)
+                else:
+                    yield mkToken(TT_INT, int(numStr), tokStart, tokEnd, fn, text)
+            else:
+                idx = tokStart
+                self.error = ExpectedCharError('expected \'=\'', Position(tokStart, fn, text), Position(tokStart + 2, fn, text))
+                break
         else:
-            return Token(TT_FLOAT, float(num_str))
-    
-    def mkIdentifier(self):
-        idstr = ''
-        posStart = self.pos.copy()
-        tokType = None
-        while self.currentChar != None and self.currentChar in LETTERS_DIGITS + '_':
-            idstr += self.currentChar
-            self.advance()
-            
-        tokType = TT_KEYWORD if idstr in KEYWORDS else TT_IDENTIFIER
-        return Token(tokType, idstr, posStart, self.pos)
-    
-    def mkNotEquals(self):
-        pos_start = self.pos.copy()
-        self.advance()
-        
-        if self.currentChar == '=':
-            self.advance()
-            return Token(TT_NE, pos_start=pos_start, pos_end=self.pos), None
+            if idx != len(text):
+                self.error = IllegalCharError('not a tok', Position(idx, fn, text), Position(idx + 1, fn, text))
 
-        self.advance()
-        return None, ExpectedCharError('expected \'=\'', pos_start, self.pos)
-    
-    def mkEquals(self):
-        pos_start = self.pos.copy()
-        self.advance()
-        tokType = TT_EQ
-        
-        if self.currentChar == '=':
-            self.advance()
-            tokType = TT_EE   
-            
-        return Token(tokType, pos_start=pos_start, pos_end=self.pos)     
-    
-    def mkGreaterThan(self):
-        pos_start = self.pos.copy()
-        self.advance()
-        tokType = TT_GT
-        
-        if self.currentChar == '=':
-            self.advance()
-            tokType = TT_GTE   
-            
-        return Token(tokType, pos_start=pos_start, pos_end=self.pos)    
-    
-    def mkLessThan(self):
-        pos_start = self.pos.copy()
-        self.advance()
-        tokType = TT_LT
-        
-        if self.currentChar == '=':
-            self.advance()
-            tokType = TT_LTE 
-            
-        return Token(tokType, pos_start=pos_start, pos_end=self.pos)    
\ No newline at end of file
+        yield mkToken(TT_EOF, None, idx, idx + 1, fn, text)
\ No newline at end of file
@@ -0,0 +1,178 @@
+from .Parser import *
+from .tokens import Token
+from .closures import BINARY_METHODS
+
+BUILTIN_CONSTANTS = ('null', 'sach', 'jhut')
+
+#######################################
+# OPTIMIZER
+#######################################
+
+# Folds constant subtrees into NumberNodes, prunes IfNode cases with constant
+# conditions and drops `x * 1`, `x + 0` style identities. Anything that could
+# raise at runtime (division by zero, undefined names) is left in the tree so
+# the error and its position are produced exactly as before.
+
+class Optimizer:
+	def __init__(self, constants=None):
+		# name -> value for globals that may be treated as literals,
+		# unless the program being optimized assigns to them
+		self.constants = constants or {}
+		self.removed = 0
+
+	def optimize(self, node):
+		assigned = set()
+		collect_assigned(node, assigned)
+		self.known = {name: value for name, value in self.constants.items() if name not in assigned}
+
+		before = count_nodes(node)
+		node = self.visit(node, False)
+		self.removed = before - count_nodes(node)
+		return node
+
+	def visit(self, node, exact_span):
+		# exact_span is set where the node's own position can surface in an
+		# error (the divisor of '/'), so it must not be replaced by a child
+		method_name = f'visit_{type(node).__name__}'
+		method = getattr(self, method_name, self.no_visit_method)
+		return method(node, exact_span)
+
+	def no_visit_method(self, node, exact_span):
+		raise Exception(f'No visit_{type(node).__name__} method defined')
+
+	###################################
+
+	def visit_NumberNode(self, node, exact_span):
+		return node
+
+	def visit_VarAccessNode(self, node, exact_span):
+		var_name = node.var_name_tok.value
+		if var_name in self.known:
+			return make_number(self.known[var_name], node.pos_start, node.pos_end)
+		return node
+
+	def visit_VarAssignNode(self, node, exact_span):
+		node.value_node = self.visit(node.value_node, exact_span)
+		return node
+
+	def visit_BinOpNode(self, node, exact_span):
+		is_div = node.op_tok.type == TT_DIV
+		left = node.left_node = self.visit(node.left_node, False)
+		right = node.right_node = self.visit(node.right_node, is_div)
+
+		if isinstance(left, NumberNode) and isinstance(right, NumberNode):
+			result, error = binary_method(node.op_tok)(Number(left.tok.value), Number(right.tok.value))
+			if not error:
+				return make_number(result.value, node.pos_start, node.pos_end)
+			return node
+
+		if exact_span:
+			return node
+
+		op_type = node.op_tok.type
+		if op_type == TT_MUL:
+			if is_int_constant(right, 1): return left
+			if is_int_constant(left, 1): return right
+		elif op_type == TT_PLUS:
+			# the one inexact identity: -0.0 + 0 is 0.0 but folds to -0.0
+			if is_int_constant(right, 0): return left
+			if is_int_constant(left, 0): return right
+		elif op_type == TT_MINUS:
+			if is_int_constant(right, 0): return left
+
+		return node
+
+	def visit_UnaryOpNode(self, node, exact_span):
+		operand = node.node = self.visit(node.node, False)
+
+		if not isinstance(operand, NumberNode):
+			return node
+
+		number = Number(operand.tok.value)
+		if node.op_tok.type == TT_MINUS:
+			number, _ = number.multed_by(Number(-1))
+		elif node.op_tok.matches(TT_KEYWORD, 'na'):
+			number, _ = number.notted()
+		return make_number(number.value, node.pos_start, node.pos_end)
+
+	def visit_IfNode(self, node, exact_span):
+		cases = []
+		else_case = node.else_case
+		taken = None
+
+		for condition, expr in node.cases:
+			condition = self.visit(condition, False)
+			expr = self.visit(expr, exact_span)
+
+			if isinstance(condition, NumberNode):
+				if Number(condition.tok.value).is_true():
+					# every later case and the else branch are unreachable
+					taken = (condition, expr)
+					else_case = expr
+					break
+				last_false = (condition, expr)
+				continue
+
+			cases.append((condition, expr))
+		else:
+			if else_case:
+				else_case = self.visit(else_case, exact_span)
+
+		if not cases:
+			if not else_case:
+				# nothing can match; one dead case keeps the None result
+				cases.append(last_false)
+			elif not exact_span:
+				return else_case
+			elif isinstance(else_case, NumberNode):
+				# a constant takes the agar's span, where errors report it
+				return make_number(else_case.tok.value, node.pos_start, node.pos_end)
+			elif taken:
+				# anything else keeps the agar around it, deciding on a constant
+				cases.append(taken)
+				else_case = None
+			else:
+				cases.append(last_false)
+
+		node.cases = cases
+		node.else_case = else_case
+		return node
+
+	def visit_WhileNode(self, node, exact_span):
+		node.condition_node = self.visit(node.condition_node, False)
+		node.body_node = self.visit(node.body_node, False)
+		return node
+
+#######################################
+# HELPERS
+#######################################
+
+def binary_method(op_tok):
+	if op_tok.type == TT_KEYWORD:
+		return BINARY_METHODS[(op_tok.type, op_tok.value)]
+	return BINARY_METHODS[op_tok.type]
+
+def make_number(value, pos_start, pos_end):
+	tok_type = TT_FLOAT if isinstance(value, float) else TT_INT
+	return NumberNode(Token(tok_type, value, pos_start, pos_end), pos_start, pos_end)
+
+def is_int_constant(node, value):
+	# only int literals: `x * 1.0` would turn an int x into a float
+	return isinstance(node, NumberNode) and type(node.tok.value) is int and node.tok.value == value
+
+def count_nodes(node):
+	count = 0
+	stack = [node]
+	while stack:
+		node = stack.pop()
+		count += 1
+		stack.extend(children(node))
+	return count
+
+def collect_assigned(node, names):
+	stack = [node]
+	while stack:
+		node = stack.pop()
+		if isinstance(node, VarAssignNode):
+			names.add(node.var_name_tok.value)
+		stack.extend(children(node))
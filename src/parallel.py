@@ -0,0 +1,101 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from .Parser import Number
+from .errors import CompileError
+from .cache import ProgramCache
+from .program import Program
+from .rtresult import RTResult
+
+# Chunks handed to each worker per round trip; larger chunks mean fewer
+# pickles and messages, smaller ones balance uneven programs better.
+CHUNKS_PER_WORKER = 4
+
+# Each worker process keeps its own cache for programs shipped as text.
+worker_cache = None
+
+def init_worker(maxsize):
+	global worker_cache
+	worker_cache = ProgramCache(maxsize)
+
+def run_job(job):
+	# runs in a worker: (source or Program, bindings) -> (raw value, error)
+	program, bindings = job
+	if isinstance(program, str):
+		try:
+			program = worker_cache.compile(program)
+		except CompileError as error:
+			return None, error.error
+
+	res = program.run(bindings)
+	if res.error:
+		return None, res.error
+	return (None if res.value is None else res.value.value), None
+
+#######################################
+# BATCH RUNNER
+#######################################
+
+# Runs many programs across a pool of worker processes, so evaluation is
+# not held to one core by the GIL. Each program runs through Program.run()
+# in a fresh frame of its own, so programs never see each other's
+# variables, and results come back in input order, one RTResult each.
+#
+# Programs are compiled in the parent when the runner has a ProgramCache
+# (or when given as Programs already) and shipped as marshalled code, so
+# workers skip lexing, parsing and transpiling; the same Program in one
+# chunk is only pickled once. Without a cache, source text is shipped and
+# each worker compiles it through its own cache.
+
+class BatchRunner:
+	def __init__(self, workers=None, cache=None, worker_cache_size=256):
+		self.workers = workers or os.cpu_count() or 1
+		self.cache = cache
+		self.worker_cache_size = worker_cache_size
+		self.pool = None
+
+	def run(self, programs, bindings=None):
+		# programs: source strings or Programs; bindings: name -> number,
+		# given to every program
+		results = [None] * len(programs)
+		jobs = []
+		indices = []
+
+		for index, program in enumerate(programs):
+			if isinstance(program, str) and self.cache is not None:
+				try:
+					program = self.cache.compile(program)
+				except CompileError as error:
+					results[index] = RTResult().failure(error.error)
+					continue
+			elif not isinstance(program, (str, Program)):
+				raise TypeError(f'expected a source string or Program, not {type(program).__name__}')
+			jobs.append((program, bindings))
+			indices.append(index)
+
+		if jobs:
+			chunksize = max(1, len(jobs) // (self.workers * CHUNKS_PER_WORKER))
+			outcomes = self.start().map(run_job, jobs, chunksize=chunksize)
+			for index, (value, error) in zip(indices, outcomes):
+				res = RTResult()
+				if error:
+					results[index] = res.failure(error)
+				else:
+					results[index] = res.success(None if value is None else Number(value))
+		return results
+
+	def start(self):
+		# the pool is created on first use and kept warm until close()
+		if self.pool is None:
+			self.pool = ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(self.worker_cache_size,))
+		return self.pool
+
+	def close(self):
+		if self.pool is not None:
+			self.pool.shutdown()
+			self.pool = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
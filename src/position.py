@@ -1,16 +1,38 @@
+from bisect import bisect_right
+from functools import lru_cache
+
+# Positions are just an offset into the source; line and column are worked
+# out on demand (normally only when an error is being shown).
+
+@lru_cache(maxsize=16)
+def line_starts(ftxt):
+	starts = [0]
+	idx = ftxt.find('\n')
+	while idx != -1:
+		starts.append(idx + 1)
+		idx = ftxt.find('\n', idx + 1)
+	return starts
+
 class Position:
-	def __init__(self, idx, ln, col, fn, ftxt):
+	__slots__ = ('idx', 'fn', 'ftxt')
+
+	def __init__(self, idx, fn, ftxt):
 		self.idx = idx
-		self.ln = ln
-		self.col = col
 		self.fn = fn
 		self.ftxt = ftxt
+
+	@property
+	def ln(self):
+		return bisect_right(line_starts(self.ftxt), self.idx) - 1
+
+	@property
+	def col(self):
+		starts = line_starts(self.ftxt)
+		return self.idx - starts[bisect_right(starts, self.idx) - 1]
+
 	def advance(self, current_char=None):
 		self.idx += 1
-		self.col += 1
-		if current_char == '\n':
-			self.ln += 1
-			self.col = 0
 		return self
+
 	def copy(self):
-		return Position(self.idx, self.ln, self.col, self.fn, self.ftxt)
\ No newline at end of file
+		return Position(self.idx, self.fn, self.ftxt)
\ No newline at end of file
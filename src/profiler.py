@@ -0,0 +1,139 @@
+import time
+from .Parser import *
+from .interpreter import Interpreter
+from .specializer import ARITHMETIC, COMPARISONS
+
+OPERATOR_SYMBOLS = {**ARITHMETIC, **COMPARISONS, TT_DIV: '/'}
+
+def describe(node):
+	# node type plus what tells two nodes of that type apart at a glance
+	kind = type(node).__name__
+	if isinstance(node, (BinOpNode, UnaryOpNode)):
+		op_tok = node.op_tok
+		return f'{kind} {op_tok.value if op_tok.type == TT_KEYWORD else OPERATOR_SYMBOLS.get(op_tok.type, op_tok.type)}'
+	if isinstance(node, (VarAccessNode, VarAssignNode)):
+		return f'{kind} {node.var_name_tok.value}'
+	return kind
+
+#######################################
+# PROFILE
+#######################################
+
+class NodeStats:
+	__slots__ = ('node', 'label', 'hits', 'total', 'own')
+
+	def __init__(self, node):
+		self.node = node
+		pos = node.pos_start
+		self.label = f'{describe(node)} {pos.fn}:{pos.ln + 1}:{pos.col + 1}'
+		self.hits = 0
+		self.total = 0.0    # seconds inside the node, its children included
+		self.own = 0.0      # seconds inside the node but not in a child
+
+	@property
+	def source(self):
+		text = self.node.pos_start.ftxt[self.node.pos_start.idx:self.node.pos_end.idx]
+		text = ' '.join(text.split())
+		return text if len(text) <= 40 else text[:37] + '...'
+
+class StackFrame:
+	# one node of the call tree: the same AST node reached by another path
+	# of ancestors is another frame
+	__slots__ = ('stats', 'children', 'own')
+
+	def __init__(self, stats):
+		self.stats = stats
+		self.children = {}
+		self.own = 0.0
+
+class Profile:
+	def __init__(self):
+		self.nodes = {}             # node -> NodeStats
+		self.root = StackFrame(None)
+
+	def stats(self):
+		return sorted(self.nodes.values(), key=lambda stats: stats.own, reverse=True)
+
+	def report(self, limit=25):
+		nodes = self.stats()
+		hits = sum(stats.hits for stats in nodes)
+		elapsed = sum(stats.own for stats in nodes) or 1e-12
+
+		by_type = {}
+		for stats in nodes:
+			kind = type(stats.node).__name__
+			entry = by_type.setdefault(kind, [0, 0.0])
+			entry[0] += stats.hits
+			entry[1] += stats.own
+
+		lines = [f'{hits} nodes evaluated in {elapsed:.6f}s', '', 'By node type:',
+			f"{'hits':>12} {'self s':>10} {'self %':>7}  type"]
+		for kind, (kind_hits, own) in sorted(by_type.items(), key=lambda item: item[1][1], reverse=True):
+			lines.append(f'{kind_hits:12} {own:10.6f} {own / elapsed:7.1%}  {kind}')
+
+		lines += ['', f'By node (top {min(limit, len(nodes))} by self time):',
+			f"{'hits':>12} {'total s':>10} {'self s':>10} {'self %':>7}  node"]
+		for stats in nodes[:limit]:
+			lines.append(f'{stats.hits:12} {stats.total:10.6f} {stats.own:10.6f} {stats.own / elapsed:7.1%}  '
+				f'{stats.label}  {stats.source}')
+		return '\n'.join(lines) + '\n'
+
+	def collapsed(self):
+		# one line per call path, 'frame;frame;frame microseconds', as read
+		# by flamegraph.pl, speedscope and similar tools
+		lines = []
+		stack = [(frame, (frame.stats.label,)) for frame in self.root.children.values()]
+		while stack:
+			frame, path = stack.pop()
+			own = round(frame.own * 1e6)
+			if own:
+				lines.append(f"{';'.join(path)} {own}")
+			stack.extend((child, path + (child.stats.label,)) for child in frame.children.values())
+		lines.sort()
+		return '\n'.join(lines) + '\n' if lines else ''
+
+#######################################
+# PROFILING INTERPRETER
+#######################################
+
+# The tree-walking interpreter, timing every node it evaluates. Times and
+# hit counts accumulate in self.profile over any number of visit() calls,
+# per AST node and per path of ancestors, the latter for collapsed-stack
+# output. Loops are not tiered up, so their bodies show up node by node;
+# Interpreter itself has no hooks and pays nothing for this.
+
+class ProfilingInterpreter(Interpreter):
+	def __init__(self):
+		super().__init__(hot_loop_threshold=None)
+		self.profile = Profile()
+		self.frame = self.profile.root
+		self.child_time = 0.0
+
+	def evaluate(self, node, context):
+		stats = self.profile.nodes.get(node)
+		if stats is None:
+			stats = self.profile.nodes[node] = NodeStats(node)
+		parent = self.frame
+		frame = parent.children.get(stats)
+		if frame is None:
+			frame = parent.children[stats] = StackFrame(stats)
+
+		method = self.methods.get(type(node))
+		if method is None:
+			method = self.methods[type(node)] = getattr(self, f'visit_{type(node).__name__}', self.no_visit_method)
+
+		outer_child_time = self.child_time
+		self.child_time = 0.0
+		self.frame = frame
+		start = time.perf_counter()
+		try:
+			return method(node, context)
+		finally:
+			elapsed = time.perf_counter() - start
+			own = elapsed - self.child_time
+			stats.hits += 1
+			stats.total += elapsed
+			stats.own += own
+			frame.own += own
+			self.frame = parent
+			self.child_time = outer_child_time + elapsed
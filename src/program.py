@@ -0,0 +1,110 @@
+import marshal
+from .Parser import Number, Parser
+from .lexer import Lexer
+from .errors import *
+from .context import Context
+from .position import Position
+from .rtresult import RTResult
+from .transpiler import Fault, Transpiler, load_function
+
+BUILTINS = {'null': 0, 'sach': 1, 'jhut': 0}
+
+#######################################
+# PROGRAM
+#######################################
+
+# A compiled program holds nothing that changes after compile(): the
+# transpiled Python function, its variable names and its error positions.
+# Every run() gets a fresh frame (the Python function's own locals plus a
+# dict of variables), so one Program can be run from any number of
+# threads at once.
+
+# Source may hold several newline-separated expressions, as in a file run
+# by `swing.py run`; the program's value is that of the last one.
+
+def compile(source, fn='<program>'):
+	tokens, error = Lexer(source, fn).getTokens()
+	if error: raise CompileError(error)
+	try:
+		ast = Parser(tokens).parse_program()
+		if ast.error: raise CompileError(ast.error)
+		transpiler = Transpiler()
+		code = transpiler.compile_code(ast.node)
+	except (RecursionError, SyntaxError):
+		# RecursionError from our parser or transpiler, SyntaxError from
+		# Python's compile() ("too many statically nested blocks")
+		raise CompileError(too_deep_error(source, fn)) from None
+	return Program(source, fn, code, transpiler.locals, transpiler.writes, transpiler.faults)
+
+def too_deep_error(source, fn):
+	pos_start = Position(0, fn, source)
+	pos_end = Position(min(1, len(source)), fn, source)
+	return RTError(pos_start, pos_end, 'Program too deeply nested', Context(fn))
+
+class Program:
+	__slots__ = ('source', 'fn', 'code', 'names', 'writes', 'faults', 'function')
+
+	def __init__(self, source, fn, code, names, writes, faults):
+		set_field = object.__setattr__
+		set_field(self, 'source', source)
+		set_field(self, 'fn', fn)
+		set_field(self, 'code', code)
+		set_field(self, 'names', tuple(names))
+		set_field(self, 'writes', tuple(writes))
+		set_field(self, 'faults', tuple(faults))
+		set_field(self, 'function', load_function(code))
+
+	def __setattr__(self, name, value):
+		raise AttributeError('Program is immutable')
+
+	def run(self, bindings=None):
+		# bindings: name -> int, float or Number; it is not modified
+		variables = dict(BUILTINS)
+		if bindings: variables.update(bindings)
+		return self.run_in(variables)
+
+	def run_in(self, variables):
+		# Like run(), but variables is the frame: assignments made by the
+		# program are left in it, as raw ints/floats. Not for sharing
+		# between threads.
+		res = RTResult()
+		args = []
+		for name in self.names:
+			value = variables.get(name)
+			if type(value) is int or type(value) is float or value is None:
+				args.append(value)
+			elif isinstance(value, Number):
+				args.append(value.value)
+			else:
+				raise TypeError(f'{name!r} must be bound to a number, not {type(value).__name__}')
+
+		result, values = self.function(*args)
+		for name, value in zip(self.writes, values):
+			if value is None:
+				variables.pop(name, None)
+			else:
+				variables[name] = value
+
+		if isinstance(result, Fault):
+			pos_start, pos_end, details = self.faults[result.index]
+			return res.failure(RTError(pos_start, pos_end, details, Context(self.fn)))
+		if result is None:
+			return res.success(None)
+		return res.success(Number(result))
+
+	def to_bytes(self):
+		# code objects do not pickle, but marshal stores them as a .pyc does
+		faults = tuple((pos_start.idx, pos_end.idx, details) for pos_start, pos_end, details in self.faults)
+		return marshal.dumps((self.fn, self.source, self.code, self.names, self.writes, faults))
+
+	def __reduce__(self):
+		return (load_program, (self.to_bytes(),))
+
+	def __repr__(self):
+		return f'<Program {self.fn} {self.source[:40]!r}>'
+
+def load_program(data):
+	# inverse of Program.to_bytes(); raises on data that does not fit
+	fn, source, code, names, writes, faults = marshal.loads(data)
+	faults = [(Position(start, fn, source), Position(end, fn, source), details) for start, end, details in faults]
+	return Program(source, fn, code, names, writes, faults)
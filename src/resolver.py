@@ -0,0 +1,21 @@
+from .Parser import *
+from .symbolTable import slot_for
+
+#######################################
+# RESOLVER
+#######################################
+
+# Assigns every VarAccessNode/VarAssignNode its slot ahead of time so the
+# evaluators index SymbolTable.values instead of looking names up. Nodes
+# that never went through a Resolver, and names past MAX_SLOTS, keep slot
+# None and use the name path.
+
+class Resolver:
+	def resolve(self, node):
+		stack = [node]
+		while stack:
+			current = stack.pop()
+			if isinstance(current, (VarAccessNode, VarAssignNode)):
+				current.slot = slot_for(current.var_name_tok.value)
+			stack.extend(children(current))
+		return node
\ No newline at end of file
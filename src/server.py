@@ -0,0 +1,268 @@
+import asyncio
+import json
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from .errors import CompileError
+from .cache import ProgramCache, cache_key
+from .program import BUILTINS, load_program
+
+# Programs each worker keeps loaded; the server mirrors every worker's set
+# so a program's code is only sent to a worker that does not have it.
+WORKER_PROGRAMS = 256
+DEFAULT_BUDGET = 5.0     # seconds a request may run before its worker is killed
+SPARE_THREADS = 2       # threads for compiles and respawns, beyond one per worker
+MAX_LINE = 1 << 20
+
+def error_info(error):
+	# same shape as `swing.py batch --format ndjson`
+	pos = error.pos
+	return {
+		'name': error.name,
+		'details': error.details,
+		'column': pos.col + 1 if pos else None,
+		'message': error.asStr(),
+	}
+
+def internal_error(details):
+	return {'name': 'Internal Error', 'details': details, 'column': None, 'message': f'Internal Error: {details}'}
+
+#######################################
+# WORKER PROCESS
+#######################################
+
+def worker_main(conn):
+	# first message: None once the imports are done, so the parent can tell
+	# a booting worker from a busy one
+	# job: (cache key, Program.to_bytes() or None, variables)
+	# reply: (value, error info or None, variables after the run)
+	conn.send(None)
+	programs = OrderedDict()
+	while True:
+		try:
+			key, data, variables = conn.recv()
+		except (EOFError, KeyboardInterrupt):
+			return
+
+		if data is not None:
+			programs[key] = load_program(data)
+		programs.move_to_end(key)
+		program = programs[key]
+		while len(programs) > WORKER_PROGRAMS:
+			programs.popitem(last=False)
+
+		try:
+			res = program.run_in(variables)
+		except Exception as e:
+			conn.send((None, internal_error(repr(e)), None))
+			continue
+		if res.error:
+			conn.send((None, error_info(res.error), variables))
+		else:
+			conn.send((None if res.value is None else res.value.value, None, variables))
+
+class Worker:
+	def __init__(self, context):
+		self.context = context
+		self.conn, child_conn = context.Pipe()
+		self.process = context.Process(target=worker_main, args=(child_conn,), daemon=True)
+		self.process.start()
+		child_conn.close()
+		self.programs = OrderedDict()   # mirror of the worker's loaded programs
+		# blocking until the worker is ready, so no request's budget pays
+		# for the interpreter start and imports
+		self.conn.recv()
+
+	def job(self, key, program, variables):
+		if key in self.programs:
+			self.programs.move_to_end(key)
+			data = None
+		else:
+			self.programs[key] = True
+			data = program.to_bytes()
+			while len(self.programs) > WORKER_PROGRAMS:
+				self.programs.popitem(last=False)
+		return key, data, variables
+
+	def call(self, job):
+		# blocking; run on the server's thread pool
+		self.conn.send(job)
+		return self.conn.recv()
+
+	def kill(self):
+		# a thread blocked in call() sees the pipe close and gives up
+		self.process.kill()
+		self.process.join()
+
+	def replace(self):
+		# blocking, like call(): kills this worker and starts another
+		self.kill()
+		return Worker(self.context)
+
+#######################################
+# SERVER
+#######################################
+
+# Newline-delimited JSON over a local TCP or Unix socket. Each request is
+#
+#   {"id": any, "source": "...", "session": "name", "budget": seconds}
+#
+# with everything but source optional, and gets one response line:
+#
+#   {"id": ..., "value": number or null}  or  {"id": ..., "error": {...}}
+#
+# {"id": ..., "session": "name", "drop": true} forgets a session.
+#
+# Programs are compiled once through a ProgramCache and run in a pool of
+# warm worker processes, so a request costs no process start, import or
+# parse. A session keeps its variables between requests (the frame
+# Program.run_in() reads and updates) and runs one request at a time;
+# requests without a session start from the builtins. A request that
+# outlives its budget has its worker killed and replaced, and leaves its
+# session as it was; the other workers carry on meanwhile. Responses on
+# one connection come back as requests finish, matched by id.
+
+class Server:
+	def __init__(self, workers=None, budget=DEFAULT_BUDGET, cache=None):
+		self.size = workers or os.cpu_count() or 1
+		self.budget = budget
+		self.cache = cache if cache is not None else ProgramCache()
+		# spawned, not forked: the server process runs threads
+		self.mp_context = multiprocessing.get_context('spawn')
+		self.idle = None
+		self.threads = None
+		self.sessions = {}      # name -> [variables, asyncio.Lock]
+		self.requests = 0
+		self.timeouts = 0
+
+	async def start(self):
+		# a thread per worker for its call(), and spare ones so a compile
+		# or respawn never waits behind calls
+		self.threads = ThreadPoolExecutor(self.size + SPARE_THREADS)
+		self.idle = asyncio.Queue()
+		loop = asyncio.get_running_loop()
+		workers = [loop.run_in_executor(self.threads, Worker, self.mp_context) for _ in range(self.size)]
+		for worker in await asyncio.gather(*workers):
+			self.idle.put_nowait(worker)
+
+	def close(self):
+		if self.idle is not None:
+			while not self.idle.empty():
+				self.idle.get_nowait().kill()
+		if self.threads is not None:
+			self.threads.shutdown(wait=False)
+
+	async def serve(self, host='127.0.0.1', port=0, path=None):
+		# returns the asyncio server; its sockets give the bound address
+		await self.start()
+		if path:
+			return await asyncio.start_unix_server(self.handle, path, limit=MAX_LINE)
+		return await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+
+	async def handle(self, reader, writer):
+		tasks = set()
+		try:
+			while True:
+				try:
+					line = await reader.readline()
+				except ValueError:
+					writer.write(b'{"id": null, "error": {"name": "Bad Request", "details": "line too long"}}\n')
+					break
+				if not line: break
+				if line.isspace(): continue
+				task = asyncio.ensure_future(self.respond(line, writer))
+				tasks.add(task)
+				task.add_done_callback(tasks.discard)
+		except ConnectionError:
+			pass
+		# requests in flight finish even if the client has gone, so no
+		# worker is handed back while it is still running a job
+		if tasks:
+			await asyncio.wait(tasks)
+		try:
+			await writer.drain()
+		except ConnectionError:
+			pass
+		writer.close()
+
+	async def respond(self, line, writer):
+		try:
+			request = json.loads(line)
+			if not isinstance(request, dict): raise ValueError('not an object')
+		except ValueError as e:
+			response = {'id': None, 'error': {'name': 'Bad Request', 'details': str(e)}}
+		else:
+			try:
+				response = await self.evaluate(request)
+			except Exception as e:
+				# a bug or resource limit must still answer the request
+				response = {'id': request.get('id'), 'error': internal_error(repr(e))}
+		if not writer.is_closing():
+			writer.write(json.dumps(response).encode('utf-8') + b'\n')
+
+	async def evaluate(self, request):
+		self.requests += 1
+		request_id = request.get('id')
+		name = request.get('session')
+
+		if request.get('drop'):
+			self.sessions.pop(name, None)
+			return {'id': request_id, 'value': None}
+		source = request.get('source')
+		if not isinstance(source, str):
+			return {'id': request_id, 'error': {'name': 'Bad Request', 'details': 'source must be a string'}}
+		budget = request.get('budget', self.budget)
+		if not isinstance(budget, (int, float)) or budget <= 0:
+			budget = self.budget
+		budget = min(budget, self.budget)
+
+		# lexing, parsing and compiling a big source would stall every
+		# other connection if done on the event loop
+		fn = '<request>'
+		loop = asyncio.get_running_loop()
+		try:
+			program = await loop.run_in_executor(self.threads, self.cache.compile, source, fn)
+		except CompileError as e:
+			return {'id': request_id, 'error': error_info(e.error)}
+		key = cache_key(source, fn)
+
+		if name is None:
+			response, _ = await self.run(request_id, key, program, dict(BUILTINS), budget)
+			return response
+		session = self.sessions.get(name)
+		if session is None:
+			session = self.sessions[name] = [dict(BUILTINS), asyncio.Lock()]
+		async with session[1]:
+			response, variables = await self.run(request_id, key, program, dict(session[0]), budget)
+			if variables is not None:
+				session[0] = variables
+			return response
+
+	async def run(self, request_id, key, program, variables, budget):
+		# returns (response, variables after the run or None)
+		worker = await self.idle.get()
+		loop = asyncio.get_running_loop()
+		call = loop.run_in_executor(self.threads, worker.call, worker.job(key, program, variables))
+		try:
+			value, error, variables = await asyncio.wait_for(call, budget)
+		except asyncio.TimeoutError:
+			self.timeouts += 1
+			worker = await loop.run_in_executor(self.threads, worker.replace)
+			return {'id': request_id, 'error': {
+				'name': 'Budget Exceeded',
+				'details': f'still running after {budget:g}s',
+				'column': None,
+				'message': f'Budget Exceeded: still running after {budget:g}s',
+			}}, None
+		except (EOFError, OSError) as e:
+			# the worker died (killed, or crashed in the job); replace it
+			# like one that ran out of budget
+			worker = await loop.run_in_executor(self.threads, worker.replace)
+			return {'id': request_id, 'error': internal_error(f'worker failed: {e!r}')}, None
+		finally:
+			self.idle.put_nowait(worker)
+
+		if error:
+			return {'id': request_id, 'error': error}, variables
+		return {'id': request_id, 'value': value}, variables
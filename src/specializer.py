@@ -0,0 +1,263 @@
+import math
+from .Parser import *
+
+# A jabtak loop that has run this many iterations on the generic path is
+# compiled into a specialized Python function for the rest of its work.
+HOT_LOOP_THRESHOLD = 100
+
+ARITHMETIC = {
+	TT_PLUS: '+',
+	TT_MINUS: '-',
+	TT_MUL: '*'
+}
+
+COMPARISONS = {
+	TT_EE: '==',
+	TT_NE: '!=',
+	TT_LT: '<',
+	TT_GT: '>',
+	TT_LTE: '<=',
+	TT_GTE: '>='
+}
+
+class Bailout(Exception):
+	pass
+
+class NotSpecializable(Exception):
+	pass
+
+def bail():
+	raise Bailout
+
+# 'aur'/'ya' evaluate both operands before combining them; these keep that
+# when the right operand has effects Python's short-circuit would skip
+def both_and(left, right):
+	return int(left and right)
+
+def both_or(left, right):
+	return int(left or right)
+
+#######################################
+# TIER STATS
+#######################################
+
+class TierStats:
+	def __init__(self):
+		self.compiled = 0   # loops turned into specialized functions
+		self.rejected = 0   # loops using something the specializer cannot express
+		self.entries = 0    # times a hot loop continued on its specialized function
+		self.bailouts = 0   # guards that failed, on entry or mid-loop
+
+	def __repr__(self):
+		return (f'TierStats(compiled={self.compiled}, rejected={self.rejected}, '
+			f'entries={self.entries}, bailouts={self.bailouts})')
+
+#######################################
+# SPECIALIZED LOOP
+#######################################
+
+class SpecializedLoop:
+	def __init__(self, function, names, reads, writes, source):
+		self.function = function
+		self.names = names      # every variable, in parameter order
+		self.reads = reads      # variables that must be bound on entry
+		self.writes = writes    # variables returned for write-back, in order
+		self.source = source
+
+	def run(self, context, stats):
+		# Type guard: every variable the loop reads must hold an unboxed int
+		# or float. Returns False when the generic path has to carry on.
+		table = context.symbolTable
+		args = []
+		for name in self.names:
+			value = table.get(name)
+			if value is None:
+				if name in self.reads:
+					stats.bailouts += 1
+					return False
+				args.append(None)
+				continue
+			value = value.value
+			if type(value) is not int and type(value) is not float:
+				stats.bailouts += 1
+				return False
+			args.append(value)
+
+		stats.entries += 1
+		finished, *values = self.function(*args)
+		# after a bailout these are the values at the start of the failing
+		# iteration, which the generic path then runs again
+		for name, value in zip(self.writes, values):
+			if value is not None:
+				table.set(name, Number(value))
+		if not finished:
+			stats.bailouts += 1
+		return finished
+
+#######################################
+# LOOP SPECIALIZER
+#######################################
+
+# Turns a WhileNode into a Python function over raw numbers. Number's
+# methods are thin wrappers over Python's int/float operators, so the
+# unboxed code computes the same values; the guards cover what Number
+# handles differently: division by zero bails out instead of raising, and
+# anything else the generated code cannot mirror exactly (an if without
+# nahito or a jabtak used as a value) keeps the loop on the generic path.
+
+class LoopSpecializer:
+	def specialize(self, node):
+		self.locals = {}
+		self.reads = set()
+		self.writes = []
+		self.temps = 0
+
+		body = []
+		condition = self.condition(node.condition_node)
+		self.stmt(node.body_node, '\t\t\t', body)
+
+		names = list(self.locals)
+		params = ', '.join(self.locals.values())
+		written = [self.locals[name] for name in self.writes]
+		snapshot = [f's{i}' for i in range(len(written))]
+
+		lines = [f'def loop({params}):', '\ttry:', '\t\twhile True:']
+		if written:
+			lines.append(f"\t\t\t{', '.join(snapshot)}, = {', '.join(written)},")
+		lines.append(f'\t\t\tif not {condition}: break')
+		lines.extend(body)
+		lines.append('\texcept (Bailout, ArithmeticError):')
+		lines.append(f"\t\treturn (False, {''.join(s + ', ' for s in snapshot)})")
+		lines.append(f"\treturn (True, {''.join(v + ', ' for v in written)})")
+		source = '\n'.join(lines) + '\n'
+
+		namespace = {'Bailout': Bailout, 'bail': bail, 'both_and': both_and, 'both_or': both_or}
+		exec(compile(source, '<jabtak>', 'exec'), namespace)
+		return SpecializedLoop(namespace['loop'], names, frozenset(self.reads), list(self.writes), source)
+
+	def local(self, name):
+		if name not in self.locals:
+			self.locals[name] = f'v{len(self.locals)}'
+		return self.locals[name]
+
+	def temp(self):
+		self.temps += 1
+		return f't{self.temps}'
+
+	###################################
+
+	def stmt(self, node, indent, lines):
+		# node evaluated for its effects only; its value is discarded
+		if isinstance(node, WhileNode):
+			lines.append(f'{indent}while {self.condition(node.condition_node)}:')
+			self.stmt(node.body_node, indent + '\t', lines)
+		elif isinstance(node, IfNode):
+			keyword = 'if'
+			for condition, expr in node.cases:
+				lines.append(f'{indent}{keyword} {self.condition(condition)}:')
+				self.stmt(expr, indent + '\t', lines)
+				keyword = 'elif'
+			if node.else_case:
+				lines.append(f'{indent}else:')
+				self.stmt(node.else_case, indent + '\t', lines)
+		elif isinstance(node, VarAssignNode):
+			value = self.expr(node.value_node)
+			lines.append(f'{indent}{self.assign(node)} = {value}')
+		else:
+			lines.append(f'{indent}{self.expr(node)}')
+
+	def condition(self, node):
+		# only is_true() of the value is needed: comparisons can stay bools
+		if isinstance(node, BinOpNode) and node.op_tok.type in COMPARISONS:
+			return f'({self.expr(node.left_node)} {COMPARISONS[node.op_tok.type]} {self.expr(node.right_node)})'
+		return self.expr(node)
+
+	def assign(self, node):
+		name = node.var_name_tok.value
+		if name not in self.writes:
+			self.writes.append(name)
+		return self.local(name)
+
+	###################################
+
+	def expr(self, node):
+		method_name = f'expr_{type(node).__name__}'
+		method = getattr(self, method_name, self.not_specializable)
+		return method(node)
+
+	def not_specializable(self, node):
+		raise NotSpecializable(type(node).__name__)
+
+	def expr_NumberNode(self, node):
+		value = node.value.value
+		if type(value) is float and not math.isfinite(value):
+			raise NotSpecializable('non-finite literal')
+		return f'({value!r})'
+
+	def expr_VarAccessNode(self, node):
+		name = node.var_name_tok.value
+		self.reads.add(name)
+		return self.local(name)
+
+	def expr_VarAssignNode(self, node):
+		value = self.expr(node.value_node)
+		return f'({self.assign(node)} := {value})'
+
+	def expr_BinOpNode(self, node):
+		left = self.expr(node.left_node)
+		right = self.expr(node.right_node)
+		op_tok = node.op_tok
+
+		if op_tok.type in ARITHMETIC:
+			return f'({left} {ARITHMETIC[op_tok.type]} {right})'
+		if op_tok.type in COMPARISONS:
+			return f'(1 if {left} {COMPARISONS[op_tok.type]} {right} else 0)'
+		if op_tok.type == TT_DIV:
+			# operands land in temps so they are evaluated once, left first
+			dividend, divisor = self.temp(), self.temp()
+			return f'({dividend} / {divisor} if (({dividend} := {left}) or True) and ({divisor} := {right}) else bail())'
+
+		if op_tok.matches(TT_KEYWORD, 'aur'):
+			if is_pure(node.right_node):
+				return f'int({left} and {right})'
+			return f'both_and({left}, {right})'
+		if op_tok.matches(TT_KEYWORD, 'ya'):
+			if is_pure(node.right_node):
+				return f'int({left} or {right})'
+			return f'both_or({left}, {right})'
+
+		raise NotSpecializable(op_tok.type)
+
+	def expr_UnaryOpNode(self, node):
+		operand = self.expr(node.node)
+		if node.op_tok.type == TT_MINUS:
+			return f'({operand} * -1)'
+		if node.op_tok.matches(TT_KEYWORD, 'na'):
+			return f'(0 if {operand} else 1)'
+		return operand
+
+	def expr_IfNode(self, node):
+		if not node.else_case:
+			# its value would be None, which no operator accepts
+			raise NotSpecializable('agar without nahito')
+
+		parts = []
+		for condition, expr in node.cases:
+			parts.append(f'{self.expr(expr)} if {self.condition(condition)} else ')
+		return f"({''.join(parts)}{self.expr(node.else_case)})"
+
+#######################################
+# HELPERS
+#######################################
+
+def is_pure(node):
+	# no assignments, divisions or loops: skipping it cannot change anything
+	stack = [node]
+	while stack:
+		node = stack.pop()
+		if isinstance(node, (VarAssignNode, WhileNode, IfNode)):
+			return False
+		if isinstance(node, BinOpNode) and node.op_tok.type == TT_DIV:
+			return False
+		stack.extend(children(node))
+	return True
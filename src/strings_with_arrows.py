@@ -3,8 +3,8 @@ def string_with_arrows(text, pos_start, pos_end):
     result = ''
 
     # Calculate indices
-    idx_start = max(text.rfind('\n', 0, pos_start.idx), 0)
-    idx_end = text.find('\n', idx_start + 1)
+    idx_start = text.rfind('\n', 0, pos_start.idx) + 1
+    idx_end = text.find('\n', idx_start)
     if idx_end < 0: idx_end = len(text)
     
     # Generate each line
@@ -17,11 +17,11 @@ def string_with_arrows(text, pos_start, pos_end):
 
         # Append to result
         result += line + '\n'
-        result += ' ' * col_start + '^' * (col_end - col_start)
+        result += ' ' * col_start + '^' * max(col_end - col_start, 1)
 
         # Re-calculate indices
-        idx_start = idx_end
-        idx_end = text.find('\n', idx_start + 1)
+        idx_start = idx_end + 1
+        idx_end = text.find('\n', idx_start)
         if idx_end < 0: idx_end = len(text)
 
     return result.replace('\t', '')
\ No newline at end of file
@@ -1,16 +1,86 @@
+import threading
+
+# Every identifier gets one process-wide slot number the first time it is
+# seen, so a resolved AST can index the values list of any SymbolTable
+# directly. Slots are never reused; names first defined later (e.g. on a
+# new REPL line) just get the next number, up to MAX_SLOTS. Past that,
+# slot_for returns None and tables keep the name in a dict instead, so a
+# long-running process seeing ever new names does not make every fresh
+# table's values list as long as all the names it has ever seen.
+MAX_SLOTS = 1024
+SLOTS = {}
+NAMES = []
+_slots_lock = threading.Lock()
+
+def slot_for(name):
+    slot = SLOTS.get(name)
+    if slot is None and len(NAMES) < MAX_SLOTS:
+        with _slots_lock:
+            slot = SLOTS.get(name)
+            if slot is None and len(NAMES) < MAX_SLOTS:
+                slot = len(NAMES)
+                NAMES.append(name)
+                SLOTS[name] = slot
+    return slot
+
 class SymbolTable:
     def __init__(self):
-        self.symbols = {}
+        # values[slot] is None for names this table does not define
+        self.values = []
+        # names past MAX_SLOTS
+        self.overflow = {}
         self.parent = None
-        
+
     def get(self, name):
-        value = self.symbols.get(name, None)
-        if value == None and self.parent:
+        slot = SLOTS.get(name)
+        if slot is None:
+            value = self.overflow.get(name)
+        else:
+            values = self.values
+            value = values[slot] if slot < len(values) else None
+        if value is None and self.parent:
             return self.parent.get(name)
         return value
-        
+
+    def get_slot(self, slot):
+        values = self.values
+        value = values[slot] if slot < len(values) else None
+        if value is None and self.parent:
+            return self.parent.get_slot(slot)
+        return value
+
     def set(self, name, value):
-        self.symbols[name] = value
-    
+        slot = slot_for(name)
+        if slot is None:
+            self.overflow[name] = value
+        else:
+            self.set_slot(slot, value)
+
+    def set_slot(self, slot, value):
+        values = self.values
+        if slot >= len(values):
+            self.reserve(slot + 1)
+        values[slot] = value
+
+    def reserve(self, size):
+        # grow in place: evaluators may hold on to self.values
+        values = self.values
+        if size > len(values):
+            values.extend([None] * (size - len(values)))
+
     def remove(self, name):
-        del self.symbols[name]
\ No newline at end of file
+        slot = SLOTS.get(name)
+        if slot is None:
+            if self.overflow.get(name) is None:
+                raise KeyError(name)
+            del self.overflow[name]
+            return
+        if slot >= len(self.values) or self.values[slot] is None:
+            raise KeyError(name)
+        self.values[slot] = None
+
+    @property
+    def symbols(self):
+        symbols = {NAMES[slot]: value for slot, value in enumerate(self.values) if value is not None}
+        symbols.update((name, value) for name, value in self.overflow.items() if value is not None)
+        return symbols
\ No newline at end of file
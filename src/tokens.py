@@ -1,17 +1,44 @@
+from .position import Position
+
 class Token:
+	# only offsets are stored; Positions are built when something asks for them
+	__slots__ = ('type', 'value', 'start', 'end', 'fn', 'ftxt')
+
 	def __init__(self, type_, value=None, pos_start=None, pos_end=None):
 		self.type = type_
 		self.value = value
-		self.pos_start = 0
-		self.pos_end = 0
+		self.start = self.end = None
+		self.fn = self.ftxt = None
 
 		if pos_start:
-			self.pos_start = pos_start.copy()
-			self.pos_end = pos_start.copy()
-			self.pos_end.advance()
+			self.start = pos_start.idx
+			self.end = pos_start.idx + 1
+			self.fn = pos_start.fn
+			self.ftxt = pos_start.ftxt
 
 		if pos_end:
-			self.pos_end = pos_end
+			self.end = pos_end.idx
+
+	@classmethod
+	def at(cls, type_, value, start, end, fn, ftxt):
+		tok = cls.__new__(cls)
+		tok.type = type_
+		tok.value = value
+		tok.start = start
+		tok.end = end
+		tok.fn = fn
+		tok.ftxt = ftxt
+		return tok
+
+	@property
+	def pos_start(self):
+		if self.start is None: return None
+		return Position(self.start, self.fn, self.ftxt)
+
+	@property
+	def pos_end(self):
+		if self.end is None: return None
+		return Position(self.end, self.fn, self.ftxt)
    
 	def matches(self, type_, value):
 		return self.type == type_ and self.value == value
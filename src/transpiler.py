@@ -0,0 +1,342 @@
+import ast
+from functools import partial
+from .Parser import *
+from .errors import *
+from .rtresult import RTResult
+from .interpreter import Interpreter
+
+COMPARE_OPS = {
+	TT_EE: ast.Eq,
+	TT_NE: ast.NotEq,
+	TT_LT: ast.Lt,
+	TT_GT: ast.Gt,
+	TT_LTE: ast.LtE,
+	TT_GTE: ast.GtE
+}
+
+ARITHMETIC_OPS = {
+	TT_PLUS: ast.Add,
+	TT_MINUS: ast.Sub,
+	TT_MUL: ast.Mult
+}
+
+# Shape of every transpiled program; the parameters and the statements in
+# the try block are filled in per program.
+TEMPLATE = '''
+def program():
+	try:
+		pass
+	except Fault as fault:
+		return fault, ()
+	return result, ()
+'''
+
+class Fault(Exception):
+	# raised by the generated code; index picks the error in faults
+	def __init__(self, index):
+		self.index = index
+
+def raise_fault(index):
+	raise Fault(index)
+
+def load_function(code):
+	namespace = {'Fault': Fault, 'raise_fault': raise_fault}
+	exec(code, namespace)
+	return namespace['program']
+
+#######################################
+# TRANSPILER
+#######################################
+
+# Translates a Swing AST into a Python function so CPython's own bytecode
+# interpreter runs it. Variables live in Python locals as raw ints/floats
+# (None when unbound), read from the symbol table on entry and written back
+# on exit, including when a runtime error stops the program halfway.
+#
+# Swing's expressions can contain loops, which Python expressions cannot;
+# a subtree that needs statements is lifted out in front of its parent,
+# after the siblings to its left have been saved in temporaries, so
+# everything still runs in the interpreter's left-to-right order.
+
+class Transpiler:
+	def compile(self, node):
+		function = load_function(self.compile_code(node))
+		return TranspiledProgram(function, list(self.locals), list(self.writes), self.faults)
+
+	def compile_code(self, node):
+		# the module's code object; marshal can store it like a .pyc
+		return compile(self.transpile(node), '<swing>', 'exec')
+
+	def transpile(self, node):
+		# node may also be a list of top-level expressions (a whole file);
+		# the program's value is then that of the last one
+		self.locals = {}
+		self.writes = []
+		self.faults = []
+		self.temps = 0
+
+		statements = node if isinstance(node, list) else [node]
+		stmts = []
+		for statement in statements[:-1]:
+			stmts.extend(self.stmt(statement))
+		if statements:
+			last_stmts, value = self.expr(statements[-1])
+			stmts.extend(last_stmts)
+		else:
+			value = ast.Constant(None)
+		stmts.append(assign('result', value))
+
+		module = ast.parse(TEMPLATE)
+		function = module.body[0]
+		function.args.args = [ast.arg(arg=local) for local in self.locals.values()]
+		function.body[0].body = stmts
+		written = [load(self.locals[name]) for name in self.writes]
+		function.body[0].handlers[0].body[0].value.elts[1].elts = written
+		function.body[1].value.elts[1].elts = list(written)
+		return ast.fix_missing_locations(module)
+
+	def local(self, name):
+		if name not in self.locals:
+			self.locals[name] = f'v{len(self.locals)}'
+		return self.locals[name]
+
+	def temp(self):
+		self.temps += 1
+		return f't{self.temps}'
+
+	def fault(self, pos_start, pos_end, details):
+		self.faults.append((pos_start, pos_end, details))
+		return ast.Call(func=load('raise_fault'), args=[ast.Constant(len(self.faults) - 1)], keywords=[])
+
+	###################################
+
+	def expr(self, node):
+		# returns (statements to run first, expression giving the value);
+		# the statements list is only non-empty when node contains a jabtak
+		method_name = f'expr_{type(node).__name__}'
+		method = getattr(self, method_name, self.no_visit_method)
+		return method(node)
+
+	def no_visit_method(self, node):
+		raise Exception(f'No expr_{type(node).__name__} method defined')
+
+	def stmt(self, node):
+		# statements evaluating node for its effects only
+		if isinstance(node, WhileNode):
+			return self.while_stmt(node)
+		if isinstance(node, IfNode):
+			return self.if_stmt(node, None)
+		stmts, value = self.expr(node)
+		if not isinstance(value, ast.Constant):
+			stmts.append(ast.Expr(value))
+		return stmts
+
+	def condition(self, node):
+		# only truthiness is needed, so a comparison can stay a bool
+		if isinstance(node, BinOpNode) and node.op_tok.type in COMPARE_OPS:
+			stmts, left, right = self.operands(node)
+			return stmts, ast.Compare(left=left, ops=[COMPARE_OPS[node.op_tok.type]()], comparators=[right])
+		return self.expr(node)
+
+	def operands(self, node):
+		left_stmts, left = self.expr(node.left_node)
+		right_stmts, right = self.expr(node.right_node)
+		if right_stmts and not isinstance(left, ast.Constant):
+			# the right side's statements run after the left is evaluated
+			temp = self.temp()
+			left_stmts.append(assign(temp, left))
+			left = load(temp)
+		return left_stmts + right_stmts, left, right
+
+	###################################
+
+	def expr_NumberNode(self, node):
+		return [], ast.Constant(node.value.value)
+
+	def expr_VarAccessNode(self, node):
+		var_name = node.var_name_tok.value
+		local = self.local(var_name)
+		undefined = self.fault(node.pos_start, node.pos_end, f"'{var_name}' is not defined")
+		return [], ast.IfExp(
+			test=ast.Compare(left=load(local), ops=[ast.IsNot()], comparators=[ast.Constant(None)]),
+			body=load(local),
+			orelse=undefined
+		)
+
+	def expr_VarAssignNode(self, node):
+		stmts, value = self.expr(node.value_node)
+		local = self.assigned(node)
+		if stmts:
+			stmts.append(assign(local, value))
+			return stmts, load(local)
+		return [], ast.NamedExpr(target=store(local), value=value)
+
+	def expr_BinOpNode(self, node):
+		stmts, left, right = self.operands(node)
+		op_tok = node.op_tok
+
+		if op_tok.type in ARITHMETIC_OPS:
+			return stmts, ast.BinOp(left=left, op=ARITHMETIC_OPS[op_tok.type](), right=right)
+
+		if op_tok.type in COMPARE_OPS:
+			# Swing comparisons give 1 or 0, not bools
+			compare = ast.Compare(left=left, ops=[COMPARE_OPS[op_tok.type]()], comparators=[right])
+			return stmts, ast.IfExp(test=compare, body=ast.Constant(1), orelse=ast.Constant(0))
+
+		# division, aur and ya need both operands bound to names first;
+		# `(a := left) or True` keeps that from short-circuiting anything
+		a, b = self.temp(), self.temp()
+		bind_left = ast.BoolOp(op=ast.Or(), values=[ast.NamedExpr(target=store(a), value=left), ast.Constant(True)])
+		bind_right = ast.NamedExpr(target=store(b), value=right)
+
+		if op_tok.type == TT_DIV:
+			pos_start, pos_end = value_span(node.right_node)
+			return stmts, ast.IfExp(
+				test=ast.BoolOp(op=ast.And(), values=[bind_left, bind_right]),
+				body=ast.BinOp(left=load(a), op=ast.Div(), right=load(b)),
+				orelse=self.fault(pos_start, pos_end, 'Division by zero')
+			)
+
+		if op_tok.matches(TT_KEYWORD, 'aur'):
+			op = ast.And()
+		elif op_tok.matches(TT_KEYWORD, 'ya'):
+			op = ast.Or()
+		bind_right = ast.BoolOp(op=ast.Or(), values=[bind_right, ast.Constant(True)])
+		combined = ast.Call(func=load('int'), args=[ast.BoolOp(op=op, values=[load(a), load(b)])], keywords=[])
+		return stmts, ast.IfExp(
+			test=ast.BoolOp(op=ast.And(), values=[bind_left, bind_right]),
+			body=combined,
+			orelse=ast.Constant(0)
+		)
+
+	def expr_UnaryOpNode(self, node):
+		stmts, operand = self.expr(node.node)
+		if node.op_tok.type == TT_MINUS:
+			return stmts, ast.BinOp(left=operand, op=ast.Mult(), right=ast.Constant(-1))
+		if node.op_tok.matches(TT_KEYWORD, 'na'):
+			return stmts, ast.IfExp(test=operand, body=ast.Constant(0), orelse=ast.Constant(1))
+		return stmts, operand
+
+	def expr_IfNode(self, node):
+		if contains_loop(node):
+			result = self.temp()
+			return self.if_stmt(node, result), load(result)
+
+		value = self.expr(node.else_case)[1] if node.else_case else ast.Constant(None)
+		for condition, expr in reversed(node.cases):
+			value = ast.IfExp(test=self.condition(condition)[1], body=self.expr(expr)[1], orelse=value)
+		return [], value
+
+	def expr_WhileNode(self, node):
+		return self.while_stmt(node), ast.Constant(None)
+
+	###################################
+
+	def if_stmt(self, node, result):
+		# nested if/else rather than elif: a later condition may need
+		# statements of its own before it can be tested
+		def branch(expr):
+			if result is None:
+				return self.stmt(expr)
+			stmts, value = self.expr(expr)
+			return stmts + [assign(result, value)]
+
+		if node.else_case:
+			orelse = branch(node.else_case)
+		elif result is not None:
+			orelse = [assign(result, ast.Constant(None))]
+		else:
+			orelse = []
+
+		for condition, expr in reversed(node.cases):
+			cond_stmts, test = self.condition(condition)
+			orelse = cond_stmts + [ast.If(test=test, body=branch(expr) or [ast.Pass()], orelse=orelse)]
+		return orelse
+
+	def while_stmt(self, node):
+		cond_stmts, test = self.condition(node.condition_node)
+		body = self.stmt(node.body_node)
+		if cond_stmts:
+			exit_test = ast.If(test=ast.UnaryOp(op=ast.Not(), operand=test), body=[ast.Break()], orelse=[])
+			return [ast.While(test=ast.Constant(True), body=cond_stmts + [exit_test] + body, orelse=[])]
+		return [ast.While(test=test, body=body or [ast.Pass()], orelse=[])]
+
+	def assigned(self, node):
+		var_name = node.var_name_tok.value
+		if var_name not in self.writes:
+			self.writes.append(var_name)
+		return self.local(var_name)
+
+#######################################
+# TRANSPILED PROGRAM
+#######################################
+
+class TranspiledProgram:
+	def __init__(self, function, names, writes, faults):
+		self.function = function
+		self.names = names      # variables, in parameter order
+		self.writes = writes    # variables returned for write-back, in order
+		self.faults = faults    # (pos_start, pos_end, details) per Fault index
+
+	def __call__(self, context):
+		res = RTResult()
+		table = context.symbolTable
+		args = []
+		for name in self.names:
+			value = table.get(name)
+			args.append(None if value is None else value.value)
+
+		result, values = self.function(*args)
+		for name, value in zip(self.writes, values):
+			# None is written back too: assigning a valueless jabtak or
+			# agar leaves the name unbound, as in the interpreter
+			table.set(name, None if value is None else Number(value))
+
+		if isinstance(result, Fault):
+			pos_start, pos_end, details = self.faults[result.index]
+			return res.failure(RTError(pos_start, pos_end, details, context))
+		if result is None:
+			return res.success(None)
+		return res.success(Number(result))
+
+#######################################
+# TRANSPILED INTERPRETER
+#######################################
+
+class TranspiledInterpreter:
+	def visit(self, node, context):
+		return self.run(self.compile(node), context)
+
+	def compile(self, node):
+		try:
+			return Transpiler().compile(node)
+		except (SyntaxError, RecursionError):
+			# SyntaxError: nesting too deep for Python's own parser, as in
+			# Interpreter.tier_up; such a node is tree-walked instead
+			return partial(Interpreter().visit, node)
+
+	def run(self, program, context):
+		return program(context)
+
+#######################################
+# HELPERS
+#######################################
+
+def contains_loop(node):
+	# only a jabtak makes a subtree need statements
+	stack = [node]
+	while stack:
+		node = stack.pop()
+		if isinstance(node, WhileNode):
+			return True
+		stack.extend(children(node))
+	return False
+
+def load(name):
+	return ast.Name(id=name, ctx=ast.Load())
+
+def store(name):
+	return ast.Name(id=name, ctx=ast.Store())
+
+def assign(name, value):
+	return ast.Assign(targets=[store(name)], value=value)
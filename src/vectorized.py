@@ -0,0 +1,195 @@
+from .Parser import *
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+#######################################
+# BATCH RESULT
+#######################################
+
+class BatchResult:
+	def __init__(self, values, div_by_zero, undefined):
+		self.values = values            # one result per row; NaN where there is no value
+		self.div_by_zero = div_by_zero  # rows stopped by a division by zero
+		self.undefined = undefined      # rows stopped by reading an unbound name
+
+	@property
+	def failed(self):
+		return self.div_by_zero | self.undefined
+
+	def __repr__(self):
+		return f'BatchResult({len(self.values)} rows, {int(self.failed.sum())} failed)'
+
+#######################################
+# BATCH INTERPRETER
+#######################################
+
+# Evaluates one expression for every row of a set of columns at once:
+# each node becomes a NumPy operation over whole arrays instead of a
+# visit per row. agar is lowered to where(); its branches are evaluated
+# only under the mask of rows that take them, so a division by zero in a
+# branch a row does not take is not reported for that row. jabtak runs
+# until no row's condition holds, updating only the rows still looping.
+#
+# A row that hits an error stops counting for the nodes after it, like the
+# interpreter stopping at the first error; its value is meaningless and
+# the row is flagged in div_by_zero or undefined instead.
+#
+# Columns are int64 or float64 arrays, so unlike Number, ints wrap around
+# at 64 bits and int / int is rounded like float64.
+
+class BatchInterpreter:
+	def __init__(self):
+		if np is None:
+			raise ImportError('batch evaluation needs numpy')
+
+	def evaluate(self, node, columns, context=None):
+		# columns: name -> 1-D array, one entry per row; names that are not
+		# columns are looked up once in context's symbol table (sach, jhut...)
+		lengths = {len(column) for column in columns.values()}
+		if len(lengths) > 1:
+			raise ValueError('columns differ in length')
+		self.rows = lengths.pop() if lengths else 1
+
+		self.env = {name: np.asarray(column) for name, column in columns.items()}
+		self.bound = {}   # name -> rows it is bound in, for names bound by some rows only
+		self.table = context.symbolTable if context else None
+		self.div_by_zero = np.zeros(self.rows, dtype=bool)
+		self.undefined = np.zeros(self.rows, dtype=bool)
+
+		with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+			value = self.visit(node, None)
+		values = np.array(np.broadcast_to(value, (self.rows,)))
+		return BatchResult(values, self.div_by_zero, self.undefined)
+
+	def visit(self, node, active):
+		# active: mask of rows this node is evaluated for (None means all)
+		method_name = f'visit_{type(node).__name__}'
+		method = getattr(self, method_name, self.no_visit_method)
+		return method(node, active)
+
+	def no_visit_method(self, node, active):
+		raise Exception(f'No visit_{type(node).__name__} method defined')
+
+	def live(self, active):
+		# rows still running: active and not stopped by an earlier error
+		live = ~(self.div_by_zero | self.undefined)
+		return live if active is None else live & active
+
+	###################################
+
+	def visit_NumberNode(self, node, active):
+		return np.asarray(node.value.value)
+
+	def visit_VarAccessNode(self, node, active):
+		var_name = node.var_name_tok.value
+
+		if var_name in self.env:
+			bound = self.bound.get(var_name)
+			if bound is not None:
+				self.undefined |= self.live(active) & ~bound
+			return self.env[var_name]
+
+		value = self.table.get(var_name) if self.table else None
+		if value is None:
+			self.undefined |= self.live(active)
+			return np.asarray(np.nan)
+		return np.asarray(value.value)
+
+	def visit_VarAssignNode(self, node, active):
+		var_name = node.var_name_tok.value
+		value = self.visit(node.value_node, active)
+
+		if active is None:
+			self.env[var_name] = value
+			self.bound.pop(var_name, None)
+		elif var_name in self.env:
+			self.env[var_name] = np.where(active, value, self.env[var_name])
+			if var_name in self.bound:
+				self.bound[var_name] = self.bound[var_name] | active
+		else:
+			self.env[var_name] = value
+			self.bound[var_name] = active
+		return value
+
+	def visit_BinOpNode(self, node, active):
+		left = self.visit(node.left_node, active)
+		right = self.visit(node.right_node, active)
+		op_tok = node.op_tok
+
+		if op_tok.type == TT_PLUS:
+			return left + right
+		elif op_tok.type == TT_MINUS:
+			return left - right
+		elif op_tok.type == TT_MUL:
+			return left * right
+		elif op_tok.type == TT_DIV:
+			self.div_by_zero |= self.live(active) & (right == 0)
+			return np.true_divide(left, right)
+		elif op_tok.type == TT_EE:
+			return (left == right).astype(np.int64)
+		elif op_tok.type == TT_NE:
+			return (left != right).astype(np.int64)
+		elif op_tok.type == TT_LT:
+			return (left < right).astype(np.int64)
+		elif op_tok.type == TT_GT:
+			return (left > right).astype(np.int64)
+		elif op_tok.type == TT_LTE:
+			return (left <= right).astype(np.int64)
+		elif op_tok.type == TT_GTE:
+			return (left >= right).astype(np.int64)
+		elif op_tok.matches(TT_KEYWORD, 'aur'):
+			# int(a and b): astype truncates toward zero like int()
+			return to_int(np.where(left != 0, right, 0))
+		elif op_tok.matches(TT_KEYWORD, 'ya'):
+			return to_int(np.where(left != 0, left, right))
+
+	def visit_UnaryOpNode(self, node, active):
+		number = self.visit(node.node, active)
+
+		if node.op_tok.type == TT_MINUS:
+			return number * -1
+		elif node.op_tok.matches(TT_KEYWORD, 'na'):
+			return (number == 0).astype(np.int64)
+		return number
+
+	def visit_IfNode(self, node, active):
+		# cases are tried in order, each under the rows no earlier case took
+		remaining = np.ones(self.rows, dtype=bool) if active is None else active
+		conditions = []
+		values = []
+
+		for condition, expr in node.cases:
+			taken = remaining & (self.visit(condition, remaining) != 0)
+			remaining = remaining & ~taken
+			conditions.append(taken)
+			values.append(self.visit(expr, taken))
+
+		if node.else_case:
+			otherwise = self.visit(node.else_case, remaining)
+		else:
+			otherwise = np.asarray(np.nan)
+
+		result = otherwise
+		for taken, value in zip(reversed(conditions), reversed(values)):
+			result = np.where(taken, value, result)
+		return result
+
+	def visit_WhileNode(self, node, active):
+		looping = np.ones(self.rows, dtype=bool) if active is None else active
+
+		while True:
+			looping = self.live(looping) & (self.visit(node.condition_node, looping) != 0)
+			if not looping.any(): break
+			self.visit(node.body_node, looping)
+
+		return np.asarray(np.nan)
+
+#######################################
+# HELPERS
+#######################################
+
+def to_int(values):
+	return np.asarray(values).astype(np.int64)
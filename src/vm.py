@@ -0,0 +1,119 @@
+from .Parser import Number
+from .errors import *
+from .rtresult import RTResult
+from .compiler import *
+
+#######################################
+# VM
+#######################################
+
+class VM:
+	def visit(self, node, context):
+		return self.run(self.compile(node), context)
+
+	def compile(self, node):
+		return Compiler().compile(node)
+
+	def run(self, code, context):
+		res = RTResult()
+		instructions = code.instructions
+		consts = code.consts
+		names = code.names
+		slots = code.slots
+		table = context.symbolTable
+		# size the frame once so loads and stores index it without checks
+		size = max((slot for slot in slots if slot is not None), default=-1) + 1
+		if size: table.reserve(size)
+		values = table.values
+
+		stack = []
+		push = stack.append
+		pop = stack.pop
+		pc = 0
+		end = len(instructions)
+
+		# branches are ordered by how often loop bodies hit them; opcodes are
+		# spelled as literals because a global lookup per test costs ~25%
+		while pc < end:
+			op, arg = instructions[pc]
+			pc += 1
+
+			if op == 1:  # LOAD_NAME
+				try:
+					value = values[slots[arg]]
+					if value is None and table.parent:
+						value = table.parent.get_slot(slots[arg])
+				except TypeError:
+					# slot None: a name past MAX_SLOTS
+					value = table.get(names[arg])
+				if value is None:
+					return res.failure(self.error(code, pc - 1, f"'{names[arg]}' is not defined", context))
+				push(value.value)
+			elif op == 0:  # LOAD_CONST
+				push(consts[arg])
+			elif op == 8:  # BINARY_ADD
+				right = pop()
+				stack[-1] = stack[-1] + right
+			elif op == 2:  # STORE_NAME
+				# storing None (a valueless jabtak or agar) unbinds the
+				# name, as in the interpreter
+				value = stack[-1]
+				if value is not None: value = Number(value)
+				try:
+					values[slots[arg]] = value
+				except TypeError:
+					table.set(names[arg], value)
+			elif op == 5:  # JUMP_IF_FALSE
+				if pop() == 0: pc = arg
+			elif op == 4:  # JUMP
+				pc = arg
+			elif op == 14:  # BINARY_LT
+				right = pop()
+				stack[-1] = int(stack[-1] < right)
+			elif op == 9:  # BINARY_SUB
+				right = pop()
+				stack[-1] = stack[-1] - right
+			elif op == 10:  # BINARY_MUL
+				right = pop()
+				stack[-1] = stack[-1] * right
+			elif op == 3:  # POP_TOP
+				pop()
+			elif op == 15:  # BINARY_GT
+				right = pop()
+				stack[-1] = int(stack[-1] > right)
+			elif op == 12:  # BINARY_EE
+				right = pop()
+				stack[-1] = int(stack[-1] == right)
+			elif op == 11:  # BINARY_DIV
+				right = pop()
+				if right == 0:
+					return res.failure(self.error(code, pc - 1, 'Division by zero', context))
+				stack[-1] = stack[-1] / right
+			elif op == 13:  # BINARY_NE
+				right = pop()
+				stack[-1] = int(stack[-1] != right)
+			elif op == 16:  # BINARY_LTE
+				right = pop()
+				stack[-1] = int(stack[-1] <= right)
+			elif op == 17:  # BINARY_GTE
+				right = pop()
+				stack[-1] = int(stack[-1] >= right)
+			elif op == 18:  # BINARY_AND
+				right = pop()
+				stack[-1] = int(stack[-1] and right)
+			elif op == 19:  # BINARY_OR
+				right = pop()
+				stack[-1] = int(stack[-1] or right)
+			elif op == 6:  # UNARY_NEG
+				stack[-1] = stack[-1] * -1
+			elif op == 7:  # UNARY_NOT
+				stack[-1] = 1 if stack[-1] == 0 else 0
+
+		value = stack[-1]
+		if value is None:
+			return res.success(None)
+		return res.success(Number(value))
+
+	def error(self, code, pc, details, context):
+		pos_start, pos_end = code.positions[pc]
+		return RTError(pos_start, pos_end, details, context)
@@ -1,27 +1,42 @@
+import argparse
+import asyncio
+import codecs
+import functools
+import json
+import mmap
+import os
+import sys
+import time
 import src
 
 
+BACKENDS = {
+    'interpreter': src.Interpreter,
+    'iterative': src.IterativeInterpreter,
+    'vm': src.VM,
+    'closure': src.ClosureInterpreter,
+    'python': src.TranspiledInterpreter,
+}
+
 globalSymbolTable = src.SymbolTable()
 globalSymbolTable.set("null", src.Number(0)) 
 globalSymbolTable.set("sach", src.Number(1))
 globalSymbolTable.set("jhut", src.Number(0))
 
-def run():
+def run(backend='interpreter', optimize=False):
     inp = input('>>>')
     lexer = src.Lexer(inp, '<stdin>')
-    tok, error = lexer.getTokens()
-    if error:
-        print(error.asStr())
-        return
-    # print(tok)
-
-    parser = src.Parser(tok)
-    ast = parser.parse()
+    ast = src.parse_stream(lexer)
     if ast.error:
         print(ast.error.asStr())
         return
+
+    if optimize:
+        constants = {name: globalSymbolTable.get(name).value for name in src.optimizer.BUILTIN_CONSTANTS}
+        ast.node = src.Optimizer(constants).optimize(ast.node)
+    src.Resolver().resolve(ast.node)
     
-    interpreter = src.Interpreter()
+    interpreter = BACKENDS[backend]()
     context = src.Context('<program>')
     context.symbolTable = globalSymbolTable
     result = interpreter.visit(ast.node, context)
@@ -33,7 +48,288 @@ def run():
     print(result.value)
 
     
-    
-while True:
-    run()
-    
\ No newline at end of file
+def readSource(path):
+    # map the file instead of reading it into a bytes copy first; the
+    # decode is the one pass that produces the text the lexer scans
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return ''
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return str(mapped, 'utf-8')
+
+
+def runFile(path, backend='interpreter', optimize=False, timings=False, quiet=False, jobs=None,
+            profile=False, flamegraph=None, allocations=False):
+    # Runs every newline-separated expression in the file, in order, against
+    # the global table; stops at the first error. Returns the exit status.
+    phases = []
+    clock = time.perf_counter
+    tracker = src.AllocationTracker() if allocations else None
+
+    def begin():
+        if tracker: tracker.begin()
+        return clock()
+
+    def phase(name, start, note=''):
+        phases.append((name, clock() - start, note))
+        if tracker: tracker.end(name)
+
+    if tracker: tracker.start()
+    try:
+        start = begin()
+        try:
+            text = readSource(path)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f'swing: cannot read {path}: {e}', file=sys.stderr)
+            return 2
+        phase('read', start, f'{len(text)} characters')
+
+        start = begin()
+        tokens, error = src.Lexer(text, path).getTokens()
+        phase('lex', start, f'{len(tokens)} tokens')
+        if error:
+            print(error.asStr())
+            return 1
+
+        start = begin()
+        ast = src.Parser(tokens).parse_program()
+        del tokens
+        if ast.error:
+            phase('parse', start)
+            print(ast.error.asStr())
+            return 1
+        statements = ast.node
+        phase('parse', start, f'{len(statements)} expressions')
+
+        start = begin()
+        if optimize:
+            # a name assigned anywhere in the file is not a constant anywhere
+            assigned = set()
+            for node in statements:
+                src.optimizer.collect_assigned(node, assigned)
+            constants = {name: globalSymbolTable.get(name).value
+                         for name in src.optimizer.BUILTIN_CONSTANTS if name not in assigned}
+            optimizer = src.Optimizer(constants)
+            statements = [optimizer.optimize(node) for node in statements]
+        resolver = src.Resolver()
+        for node in statements:
+            resolver.resolve(node)
+        phase('optimize' if optimize else 'resolve', start)
+
+        start = begin()
+        context = src.Context('<program>')
+        context.symbolTable = globalSymbolTable
+        if jobs:
+            # independent expressions run concurrently; values print after
+            results = src.DataflowScheduler(jobs, BACKENDS[backend]).run(statements, context)
+        else:
+            interpreter = src.ProfilingInterpreter() if profile or flamegraph else BACKENDS[backend]()
+            results = (interpreter.visit(node, context) for node in statements)
+        status = 0
+        for result in results:
+            if result.error:
+                print(result.error.asStr())
+                status = 1
+                break
+            if result.value is not None and not quiet:
+                print(result.value)
+        phase('execute', start)
+
+        if profile:
+            sys.stdout.flush()
+            print(interpreter.profile.report(), end='', file=sys.stderr)
+        if flamegraph:
+            with open(flamegraph, 'w') as file:
+                file.write(interpreter.profile.collapsed())
+        return status
+    finally:
+        if timings:
+            sys.stdout.flush()
+            for name, elapsed, note in phases:
+                print(f'{name:9} {elapsed:9.4f}s  {note}', file=sys.stderr)
+            print(f'{"total":9} {sum(elapsed for _, elapsed, _ in phases):9.4f}s', file=sys.stderr)
+        if tracker:
+            tracker.stop()
+            sys.stdout.flush()
+            print(tracker.summary(), end='', file=sys.stderr)
+
+
+STREAM_CHUNK = 1 << 16
+AST_CACHE_SIZE = 4096
+
+
+def streamLines(stream, chunkSize=STREAM_CHUNK):
+    # Yields the complete lines of each large read. read1 returns whatever
+    # is already available, so a slow producer is not waited on to fill a
+    # whole chunk.
+    decoder = codecs.getincrementaldecoder('utf-8')('replace')
+    pending = ''
+    while True:
+        chunk = stream.read1(chunkSize)
+        if not chunk:
+            break
+        lines = (pending + decoder.decode(chunk)).split('\n')
+        pending = lines.pop()
+        yield lines
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield [pending]
+
+
+def parseLine(line, constants, interpreter):
+    ast = src.parse_stream(src.Lexer(line, '<stdin>'))
+    if ast.error:
+        return None, ast.error
+    node = ast.node
+    if constants is not None:
+        node = src.Optimizer(dict(constants)).optimize(node)
+    src.Resolver().resolve(node)
+    # backends with a compile step (vm, closure, python) cache its output
+    if hasattr(interpreter, 'compile'):
+        return interpreter.compile(node), None
+    return node, None
+
+
+def formatResult(lineNo, value, error, ndjson):
+    if ndjson:
+        if error:
+            pos = error.pos
+            return json.dumps({'line': lineNo, 'error': {
+                'name': error.name,
+                'details': error.details,
+                'column': pos.col + 1 if pos else None,
+                'message': error.asStr(),
+            }}) + '\n'
+        return json.dumps({'line': lineNo, 'value': None if value is None else value.value}) + '\n'
+
+    if error:
+        return error.asStr() + '\n'
+    if value is None:
+        return ''
+    return f'{value}\n'
+
+
+def runStream(inStream, outStream, backend='interpreter', optimize=False, ndjson=False):
+    # Non-interactive REPL: every non-blank line is evaluated against the
+    # global table by one long-lived backend, and the output for each input
+    # chunk is written and flushed in one go. Parsed lines are cached, since
+    # log-processing input repeats the same expressions.
+    interpreter = BACKENDS[backend]()
+    evaluate = interpreter.run if hasattr(interpreter, 'compile') else interpreter.visit
+    context = src.Context('<program>')
+    context.symbolTable = globalSymbolTable
+    parsed = {}
+    lineNo = 0
+
+    for lines in streamLines(inStream):
+        output = []
+        for line in lines:
+            lineNo += 1
+            if not line or line.isspace():
+                continue
+
+            constants = None
+            if optimize:
+                # part of the cache key: folding depends on their values
+                constants = tuple((name, globalSymbolTable.get(name).value)
+                                  for name in src.optimizer.BUILTIN_CONSTANTS
+                                  if globalSymbolTable.get(name) is not None)
+            key = (line, constants)
+            entry = parsed.get(key)
+            if entry is None:
+                if len(parsed) >= AST_CACHE_SIZE:
+                    parsed.clear()
+                entry = parsed[key] = parseLine(line, constants, interpreter)
+
+            program, error = entry
+            value = None
+            if program is not None:
+                result = evaluate(program, context)
+                value, error = result.value, result.error
+            output.append(formatResult(lineNo, value, error, ndjson))
+
+        outStream.write(''.join(output))
+        outStream.flush()
+
+
+def serve(host, port, path, workers, budget):
+    async def main():
+        server = src.Server(workers, budget)
+        listener = await server.serve(host, port, path)
+        address = path or '%s:%d' % listener.sockets[0].getsockname()[:2]
+        print(f'swing: serving on {address} with {server.size} workers', file=sys.stderr)
+        try:
+            async with listener:
+                await listener.serve_forever()
+        finally:
+            server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+def addOptions(parser, default=None):
+    # shared by the REPL and `run`, so they may come before or after it
+    parser.add_argument('--backend', choices=BACKENDS, default=default or 'interpreter',
+                        help='evaluator used for each expression (default: interpreter)')
+    parser.add_argument('-O', '--optimize', action='store_true', default=default or False,
+                        help='fold constants and prune dead branches before evaluating')
+    parser.add_argument('--max-steps', type=int, metavar='N', default=default,
+                        help='stop an expression after evaluating N nodes (interpreter backend only)')
+
+
+if __name__ == '__main__':
+    argParser = argparse.ArgumentParser(description='Swing REPL')
+    addOptions(argParser)
+    commands = argParser.add_subparsers(dest='command')
+    runParser = commands.add_parser('run', help='run a file of newline-separated expressions')
+    runParser.add_argument('file')
+    runParser.add_argument('-t', '--timings', action='store_true',
+                           help='report time spent reading, lexing, parsing and executing')
+    runParser.add_argument('-q', '--quiet', action='store_true',
+                           help='do not print expression values')
+    runParser.add_argument('-j', '--jobs', type=int, metavar='N',
+                           help='run independent expressions on N threads')
+    runParser.add_argument('--profile', action='store_true',
+                           help='report hits and time per AST node on stderr')
+    runParser.add_argument('--flamegraph', metavar='PATH',
+                           help='write collapsed stacks of time per AST node to PATH')
+    runParser.add_argument('--allocations', action='store_true',
+                           help='report objects and bytes allocated per phase on stderr')
+    addOptions(runParser, default=argparse.SUPPRESS)
+    batchParser = commands.add_parser('batch', help='evaluate stdin line by line, without prompts')
+    batchParser.add_argument('--format', choices=('text', 'ndjson'), default='text',
+                             help='text prints like the REPL; ndjson writes one object per line')
+    addOptions(batchParser, default=argparse.SUPPRESS)
+    serveParser = commands.add_parser('serve', help='evaluate newline-delimited JSON requests on a socket')
+    serveParser.add_argument('--host', default='127.0.0.1')
+    serveParser.add_argument('--port', type=int, default=7447)
+    serveParser.add_argument('--unix', metavar='PATH', help='listen on a Unix socket instead of TCP')
+    serveParser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    serveParser.add_argument('--budget', type=float, default=src.server.DEFAULT_BUDGET,
+                             help='longest a request may run, in seconds (default: %(default)s)')
+    args = argParser.parse_args()
+    if args.max_steps is not None:
+        if args.backend != 'interpreter':
+            argParser.error('--max-steps needs the interpreter backend')
+        BACKENDS['interpreter'] = functools.partial(src.BudgetInterpreter, args.max_steps)
+
+    if args.command == 'run':
+        if (args.profile or args.flamegraph) and (args.jobs or args.backend != 'interpreter' or args.max_steps):
+            argParser.error('--profile and --flamegraph need the interpreter backend, without -j or --max-steps')
+        sys.exit(runFile(args.file, args.backend, args.optimize, args.timings, args.quiet, args.jobs,
+                         args.profile, args.flamegraph, args.allocations))
+    if args.command == 'serve':
+        serve(args.host, args.port, args.unix, args.workers, args.budget)
+        sys.exit(0)
+    if args.command == 'batch':
+        runStream(sys.stdin.buffer, sys.stdout, args.backend, args.optimize, args.format == 'ndjson')
+        sys.exit(0)
+
+    try:
+        while True:
+            run(args.backend, args.optimize)
+    except (EOFError, KeyboardInterrupt):
+        print()
@@ -0,0 +1,91 @@
+"""Every backend against the tree-walking Interpreter.
+
+    python -m pytest tests
+
+Each program is run statement by statement against a fresh global table,
+as `swing.py run` does, and every backend must give the same values, the
+same errors (message, position and traceback, through asStr()) and the
+same table afterwards.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import src
+from src.generator import ProgramGenerator
+
+BACKENDS = {
+    'iterative': src.IterativeInterpreter,
+    'vm': src.VM,
+    'closure': src.ClosureInterpreter,
+    'python': src.TranspiledInterpreter,
+}
+
+PROGRAMS = [
+    # a valueless jabtak or agar leaves the name unbound
+    'yehai i = 0\nyehai z = jabtak i < 2 phir yehai i = i + 1\nz - 1',
+    'yehai z = 5\nyehai z = agar jhut phir 1\nz',
+    'yehai i = 0\nyehai z = 5\njabtak (yehai i = i + 1) < 4 phir yehai z = agar i == 1 phir 2\nz + 1',
+    # assignment values and chains
+    'yehai a = yehai b = 3 * 4\na + b',
+    'yehai a = 1\nyehai a = a + (yehai b = a * 2) + b\na',
+    'yehai i = 0\nyehai s = 0\njabtak i < 50 phir (yehai s = s + i * 2) + (yehai i = i + 1)\ns',
+    # errors and their positions
+    'yehai a = 1\n1 + nope',
+    'yehai x = 1 / (agar 0.5 phir jhut nahito 0)',
+    'yehai b = 0\n3 * (2 / (yehai c = b - 0))',
+    'yehai i = 0\njabtak i < 3 phir (yehai i = i + 1) / (i - 2)\ni',
+    'yehai a = 2\nagar a > 1 phir 10 / (a - 2) nahito 0',
+    '1 + 2\n-(jhut) / null\n4',
+]
+
+
+def freshContext():
+    table = src.SymbolTable()
+    table.set('null', src.Number(0))
+    table.set('sach', src.Number(1))
+    table.set('jhut', src.Number(0))
+    context = src.Context('<program>')
+    context.symbolTable = table
+    return context
+
+
+def run(backend, text, optimize=False):
+    tokens, error = src.Lexer(text, '<test>').getTokens()
+    assert error is None, error.asStr()
+    ast = src.Parser(tokens).parse_program()
+    assert ast.error is None, ast.error.asStr()
+
+    context = freshContext()
+    interpreter = backend()
+    outcomes = []
+    for node in ast.node:
+        if optimize:
+            node = src.Optimizer({'null': 0, 'sach': 1, 'jhut': 0}).optimize(node)
+        src.Resolver().resolve(node)
+        result = interpreter.visit(node, context)
+        if result.error:
+            outcomes.append(('error', result.error.asStr()))
+        else:
+            outcomes.append(('value', None if result.value is None else result.value.value))
+    symbols = {name: value.value for name, value in context.symbolTable.symbols.items()}
+    return outcomes, symbols
+
+
+def generated(count):
+    return [ProgramGenerator(seed).program(20 + seed % 150) for seed in range(count)]
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+@pytest.mark.parametrize('text', PROGRAMS)
+def test_matches_interpreter(name, text):
+    assert run(BACKENDS[name], text) == run(src.Interpreter, text)
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_generated_programs_match_interpreter(name):
+    for text in generated(200):
+        assert run(BACKENDS[name], text) == run(src.Interpreter, text), text